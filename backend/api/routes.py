@@ -1,16 +1,40 @@
 """API routes for FAR Laundry Tool"""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from typing import List, Dict
 import traceback
 
+import numpy as np
+
 from utils.cache import (
     get_cached_predictions,
     is_cache_valid,
     generate_and_save_cache
 )
-from utils.predict_single_day import predict_single_day
+from utils.horizon import STEP_MINUTES, Horizon
+from utils.planner import plan_day, schedule_days, slot_key, sunday_weekday
+from utils.predict_range import STREAM_CHUNK_DAYS, iter_predicted_days, predict_dates, predict_range, range_days
+from utils.predict_single_day import predict_single_day, prepared_single_day
+from utils.resolutions import BASE_RESOLUTION, RESOLUTIONS, is_valid_resolution
+from utils.responses import (
+    NDJSON_MIMETYPE,
+    PreparedResponse,
+    StatsAccumulator,
+    forecast_stats,
+    merge_predictions,
+    ndjson_record,
+    series_predictions
+)
+from utils.solver import (
+    DEFAULT_CYCLE_MINUTES,
+    MAX_DRYER_DELAY_MINUTES,
+    MAX_MIN_GAP_HOURS,
+    PlanConstraints,
+    best_time,
+    iter_schedule,
+    make_objective
+)
 
 api_bp = Blueprint('api', __name__)
 
@@ -20,6 +44,76 @@ def get_central_time() -> datetime:
     return datetime.now(ZoneInfo('America/Chicago'))
 
 
+def parse_cycle_minutes():
+    """Washer cycle length for pipeline mode, or None for the same-time objective"""
+    if request.args.get('mode', 'same') != 'pipeline':
+        return None
+    error = f'cycleMinutes must be between {STEP_MINUTES} and {24 * 60}'
+    try:
+        cycle_minutes = int(request.args.get('cycleMinutes', DEFAULT_CYCLE_MINUTES))
+    except ValueError:
+        raise ValueError(error) from None
+    if not STEP_MINUTES <= cycle_minutes <= 24 * 60:
+        raise ValueError(error)
+    return cycle_minutes
+
+
+def wants_columnar() -> bool:
+    """Whether the client asked for the compact ?format=columnar series"""
+    return request.args.get('format') == 'columnar'
+
+
+def requested_resolution() -> str:
+    """Series resolution from ?resolution= (default: every 5-minute point)"""
+    resolution = request.args.get('resolution', BASE_RESOLUTION)
+    if not is_valid_resolution(resolution):
+        choices = ', '.join([BASE_RESOLUTION, *RESOLUTIONS])
+        raise ValueError(f'resolution must be one of: {choices}')
+    return resolution
+
+
+def wants_ndjson() -> bool:
+    """Whether the client asked for a streamed application/x-ndjson response"""
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def stream_ndjson(records, error_label: str) -> Response:
+    """Stream NDJSON lines as they are produced
+
+    The status line is already sent when a later record fails, so errors
+    end the stream with an error record instead of a 500.
+    """
+    def generate():
+        try:
+            yield from records
+        except Exception as e:
+            print(f'{error_label} error: {e}')
+            traceback.print_exc()
+            yield ndjson_record('error', {'error': 'Server error'})
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def send_prepared(prepared: PreparedResponse) -> Response:
+    """Serve a pre-serialized JSON body, honoring If-None-Match and gzip"""
+    # gzip;q=0 explicitly refuses gzip
+    use_gzip = request.accept_encodings['gzip'] > 0
+    etag = prepared.gzip_etag if use_gzip else prepared.etag
+
+    # Weak comparison: proxies that re-encode bodies hand back W/"..." validators
+    if request.if_none_match.contains_weak(prepared.etag) or request.if_none_match.contains_weak(prepared.gzip_etag):
+        response = Response(status=304)
+    else:
+        response = Response(prepared.gzip_body if use_gzip else prepared.body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
 # 1. GET /api/current/{hall} - Get current predicted availability
 @api_bp.route('/current/<int:hall>', methods=['GET'])
 def get_current_availability(hall):
@@ -41,18 +135,7 @@ def get_current_availability(hall):
         dryers = 0
 
         if cached_predictions:
-            target_ts = rounded_time.replace(tzinfo=None)
-            for pred in cached_predictions.get('washers', []):
-                pred_time = datetime.fromisoformat(pred['timestamp']).replace(tzinfo=None)
-                if pred_time.hour == target_ts.hour and pred_time.minute == target_ts.minute and pred_time.day == target_ts.day:
-                    washers = pred['value']
-                    break
-
-            for pred in cached_predictions.get('dryers', []):
-                pred_time = datetime.fromisoformat(pred['timestamp']).replace(tzinfo=None)
-                if pred_time.hour == target_ts.hour and pred_time.minute == target_ts.minute and pred_time.day == target_ts.day:
-                    dryers = pred['value']
-                    break
+            washers, dryers = cached_predictions.value_at(rounded_time)
 
         # Format time like "4:30PM"
         period = 'PM' if now.hour >= 12 else 'AM'
@@ -77,53 +160,18 @@ def get_current_availability(hall):
 def get_forecast(hall):
     """Get day forecast with predictions"""
     try:
+        try:
+            resolution = requested_resolution()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Get cached predictions
         cached_predictions = get_cached_predictions(str(hall), 'day')
 
         if not cached_predictions:
             return jsonify({'predictions': [], 'stats': {}}), 200
 
-        # Build predictions list from cache
-        pred_map = {}
-        for pred in cached_predictions.get('washers', []):
-            ts = pred['timestamp']
-            if ts not in pred_map:
-                pred_map[ts] = {'washers': None, 'dryers': None}
-            pred_map[ts]['washers'] = pred['value']
-
-        for pred in cached_predictions.get('dryers', []):
-            ts = pred['timestamp']
-            if ts not in pred_map:
-                pred_map[ts] = {'washers': None, 'dryers': None}
-            pred_map[ts]['dryers'] = pred['value']
-
-        predictions = []
-        for ts, values in pred_map.items():
-            predictions.append({
-                'timestamp': ts,
-                'washers': values['washers'] or 0,
-                'dryers': values['dryers'] or 0,
-            })
-
-        predictions.sort(key=lambda x: datetime.fromisoformat(x['timestamp']))
-
-        # Calculate stats
-        all_washers = [p['washers'] for p in predictions if p['washers'] is not None]
-        all_dryers = [p['dryers'] for p in predictions if p['dryers'] is not None]
-
-        stats = {
-            'avgWashers': sum(all_washers) / len(all_washers) if all_washers else 0,
-            'avgDryers': sum(all_dryers) / len(all_dryers) if all_dryers else 0,
-            'maxWashers': max(all_washers) if all_washers else 0,
-            'maxDryers': max(all_dryers) if all_dryers else 0,
-            'minWashers': min(all_washers) if all_washers else 0,
-            'minDryers': min(all_dryers) if all_dryers else 0
-        }
-
-        return jsonify({
-            'predictions': predictions,
-            'stats': stats
-        })
+        return send_prepared(cached_predictions.prepared(resolution, wants_columnar()))
 
     except Exception as e:
         print(f'Forecast error: {e}')
@@ -136,53 +184,18 @@ def get_forecast(hall):
 def get_week_forecast(hall):
     """Get week forecast with predictions"""
     try:
+        try:
+            resolution = requested_resolution()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Get cached predictions
         cached_predictions = get_cached_predictions(str(hall), 'week')
 
         if not cached_predictions:
             return jsonify({'predictions': [], 'stats': {}}), 200
 
-        # Build predictions list from cache
-        pred_map = {}
-        for pred in cached_predictions.get('washers', []):
-            ts = pred['timestamp']
-            if ts not in pred_map:
-                pred_map[ts] = {'washers': None, 'dryers': None}
-            pred_map[ts]['washers'] = pred['value']
-
-        for pred in cached_predictions.get('dryers', []):
-            ts = pred['timestamp']
-            if ts not in pred_map:
-                pred_map[ts] = {'washers': None, 'dryers': None}
-            pred_map[ts]['dryers'] = pred['value']
-
-        predictions = []
-        for ts, values in pred_map.items():
-            predictions.append({
-                'timestamp': ts,
-                'washers': values['washers'] or 0,
-                'dryers': values['dryers'] or 0,
-            })
-
-        predictions.sort(key=lambda x: datetime.fromisoformat(x['timestamp']))
-
-        # Calculate stats
-        all_washers = [p['washers'] for p in predictions if p['washers'] is not None]
-        all_dryers = [p['dryers'] for p in predictions if p['dryers'] is not None]
-
-        stats = {
-            'avgWashers': sum(all_washers) / len(all_washers) if all_washers else 0,
-            'avgDryers': sum(all_dryers) / len(all_dryers) if all_dryers else 0,
-            'maxWashers': max(all_washers) if all_washers else 0,
-            'maxDryers': max(all_dryers) if all_dryers else 0,
-            'minWashers': min(all_washers) if all_washers else 0,
-            'minDryers': min(all_dryers) if all_dryers else 0
-        }
-
-        return jsonify({
-            'predictions': predictions,
-            'stats': stats
-        })
+        return send_prepared(cached_predictions.prepared(resolution, wants_columnar()))
 
     except Exception as e:
         print(f'Week forecast error: {e}')
@@ -195,72 +208,92 @@ def get_week_forecast(hall):
 def get_date_forecast(hall, date):
     """Get forecast for a specific date"""
     try:
+        try:
+            resolution = requested_resolution()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Compact and downsampled variants are served from memoized bodies
+        if wants_columnar() or resolution != BASE_RESOLUTION:
+            try:
+                target_date = datetime.strptime(date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+            return send_prepared(prepared_single_day(hall, target_date, resolution, wants_columnar()))
+
         # Generate predictions for this date
         washer_predictions = predict_single_day(str(hall), 'washers', date)
         dryer_predictions = predict_single_day(str(hall), 'dryers', date)
 
-        # Format predictions
-        pred_map = {}
+        predictions = merge_predictions(washer_predictions, dryer_predictions)
 
-        for pred in washer_predictions:
-            timestamp = pred['timestamp']
-            if timestamp not in pred_map:
-                pred_map[timestamp] = {'washers': None, 'dryers': None}
-            pred_map[timestamp]['washers'] = pred['value']
+        return jsonify({
+            'predictions': predictions
+        })
 
-        for pred in dryer_predictions:
-            timestamp = pred['timestamp']
-            if timestamp not in pred_map:
-                pred_map[timestamp] = {'washers': None, 'dryers': None}
-            pred_map[timestamp]['dryers'] = pred['value']
+    except Exception as e:
+        print(f'Date forecast error: {e}')
+        traceback.print_exc()
+        return jsonify({'error': 'Server error'}), 500
 
-        predictions = []
-        for timestamp, values in pred_map.items():
-            predictions.append({
-                'timestamp': timestamp,
-                'washers': values['washers'] or 0,
-                'dryers': values['dryers'] or 0
-            })
 
-        predictions.sort(key=lambda x: datetime.fromisoformat(x['timestamp']))
+# 5. GET /api/forecast-range/{hall}?start=&end= - Get forecast for a range of dates
+@api_bp.route('/forecast-range/<int:hall>', methods=['GET'])
+def get_range_forecast(hall):
+    """Get forecast for every day from start to end (inclusive)"""
+    try:
+        try:
+            days = range_days(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        start_date, end_date = days[0], days[-1]
+
+        if wants_ndjson():
+            # One record per day as soon as its batch is predicted, then the stats
+            def generate():
+                stats = StatsAccumulator()
+                for day, washers, dryers in iter_predicted_days(str(hall), days):
+                    stats.add(washers, dryers)
+                    yield ndjson_record('day', {
+                        'date': day.isoformat(),
+                        'predictions': series_predictions(Horizon.for_day(day), washers, dryers)
+                    })
+                yield ndjson_record('summary', {'stats': stats.stats()})
+
+            return stream_ndjson(generate(), 'Range forecast')
+
+        # One batched prediction per target type for the whole range
+        horizon = Horizon.for_days(start_date, end_date)
+        washers = predict_range(str(hall), 'washers', start_date, end_date)
+        dryers = predict_range(str(hall), 'dryers', start_date, end_date)
+
+        predictions = series_predictions(horizon, washers, dryers)
 
         return jsonify({
-            'predictions': predictions
+            'predictions': predictions,
+            'stats': forecast_stats(predictions)
         })
 
     except Exception as e:
-        print(f'Date forecast error: {e}')
+        print(f'Range forecast error: {e}')
         traceback.print_exc()
         return jsonify({'error': 'Server error'}), 500
 
 
-# 5. GET /api/schedule/{hall} - Get schedule planner results
+# 6. GET /api/schedule/{hall} - Get schedule planner results
 @api_bp.route('/schedule/<int:hall>', methods=['GET'])
 def get_schedule(hall):
     """Get schedule planner results"""
     try:
         # Get query parameters
-        start_date_str = request.args.get('startDate')
-        end_date_str = request.args.get('endDate')
-        frequency_days_str = request.args.get('frequencyDays')
-        days_of_week_str = request.args.get('daysOfWeek')
         time_constraints_str = request.args.get('timeConstraints')
         algorithm_preference = request.args.get('algorithmPreference', 'balanced')
 
-        if not start_date_str or not end_date_str or not frequency_days_str:
-            return jsonify({'error': 'Missing required parameters: startDate, endDate, frequencyDays'}), 400
-
-        # Parse dates (YYYY-MM-DD format)
-        start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-        end_date = datetime.strptime(end_date_str, '%Y-%m-%d')
-        frequency_days = int(frequency_days_str)
-
-        # Parse allowed days of week
-        allowed_days = []
-        if days_of_week_str:
-            allowed_days = [int(d) for d in days_of_week_str.split(',')]
-        else:
-            allowed_days = [0, 1, 2, 3, 4, 5, 6]
+        # Generate laundry day list
+        try:
+            candidate_dates = schedule_days(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Parse per-day time constraints if provided
         day_time_constraints = None
@@ -275,171 +308,172 @@ def get_schedule(hall):
             except Exception as e:
                 print(f'Error parsing timeConstraints: {e}')
 
-        if start_date > end_date:
-            return jsonify({'error': 'Start date must be before end date'}), 400
-
-        # Generate laundry day list
-        laundry_days = []
-        current_day = start_date
-
-        while current_day <= end_date:
-            day_of_week = current_day.weekday()  # Monday=0, Sunday=6
-            # Convert to Sunday=0 format (like JavaScript)
-            day_of_week_sunday = (day_of_week + 1) % 7
-
-            if day_of_week_sunday in allowed_days:
-                laundry_days.append(current_day)
-
-            current_day += timedelta(days=frequency_days)
-
-        # Helper function to get predictions for a date
-        def get_predictions_for_date(target_date):
-            target_date_str = target_date.strftime('%Y-%m-%d')
-            washer_preds = predict_single_day(str(hall), 'washers', target_date_str)
-            dryer_preds = predict_single_day(str(hall), 'dryers', target_date_str)
-            return {'washers': washer_preds, 'dryers': dryer_preds}
-
-        # Helper function to find best time for a specific day
-        def find_best_time_for_day(target_date):
-            day_of_week_index = (target_date.weekday() + 1) % 7  # Convert to Sunday=0
-            day_of_week = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'][day_of_week_index]
-
-            # Get predictions for this date
-            predictions = get_predictions_for_date(target_date)
-
-            # Determine time constraints for this specific day
-            day_min_hour = 0
-            day_max_hour = 23
-
-            if day_time_constraints and day_of_week_index in day_time_constraints:
-                day_min_hour = day_time_constraints[day_of_week_index]['start']
-                day_max_hour = day_time_constraints[day_of_week_index]['end']
-
-            # Filter predictions by time constraints
-            washer_predictions = []
-            for pred in predictions['washers']:
-                pred_date = datetime.fromisoformat(pred['timestamp'].replace('Z', '+00:00'))
-                pred_date_central = pred_date.astimezone(ZoneInfo('America/Chicago'))
-                pred_hour = pred_date_central.hour
-                if day_min_hour <= pred_hour <= day_max_hour:
-                    washer_predictions.append(pred)
-
-            dryer_predictions = []
-            for pred in predictions['dryers']:
-                pred_date = datetime.fromisoformat(pred['timestamp'].replace('Z', '+00:00'))
-                pred_date_central = pred_date.astimezone(ZoneInfo('America/Chicago'))
-                pred_hour = pred_date_central.hour
-                if day_min_hour <= pred_hour <= day_max_hour:
-                    dryer_predictions.append(pred)
-
-            # Create combined score map
-            score_map = {}
-
-            for pred in washer_predictions:
-                if pred['timestamp'] not in score_map:
-                    score_map[pred['timestamp']] = {'washers': 0, 'dryers': 0, 'combined': 0}
-                score_map[pred['timestamp']]['washers'] = pred['value']
-
-            for pred in dryer_predictions:
-                if pred['timestamp'] not in score_map:
-                    score_map[pred['timestamp']] = {'washers': 0, 'dryers': 0, 'combined': 0}
-                score_map[pred['timestamp']]['dryers'] = pred['value']
-
-            # Calculate combined scores based on algorithm preference
-            for timestamp, scores in score_map.items():
-                if algorithm_preference == 'washers':
-                    scores['combined'] = scores['washers'] * 0.7 + scores['dryers'] * 0.3
-                elif algorithm_preference == 'dryers':
-                    scores['combined'] = scores['washers'] * 0.3 + scores['dryers'] * 0.7
-                else:  # balanced
-                    scores['combined'] = (scores['washers'] + scores['dryers']) / 2
-
-            if not score_map:
-                return {
-                    'date': target_date.strftime('%Y-%m-%d'),
-                    'dayOfWeek': day_of_week,
-                    'bestTime': None,
-                    'bestTimeFormatted': 'No availability',
-                    'washersAvailable': 0,
-                    'dryersAvailable': 0,
-                    'combinedScore': 0,
-                    'alternativeTimes': []
-                }
-
-            # Sort times by combined score
-            sorted_times = sorted(score_map.items(), key=lambda x: x[1]['combined'], reverse=True)
-
-            # Get best time
-            best_timestamp, best_scores = sorted_times[0]
-            best_date = datetime.fromisoformat(best_timestamp.replace('Z', '+00:00'))
-            best_date_central = best_date.astimezone(ZoneInfo('America/Chicago'))
-
-            best_time = f"{best_date_central.hour:02d}:{best_date_central.minute:02d}"
-
-            def format_time_12h(hour, minute):
-                period = 'PM' if hour >= 12 else 'AM'
-                hour_12 = hour % 12 or 12
-                return f"{hour_12}:{minute:02d} {period}"
-
-            best_time_formatted = format_time_12h(best_date_central.hour, best_date_central.minute)
-
-            # Get alternative times (top 3 after best)
-            alternative_times = []
-            for timestamp, scores in sorted_times[1:4]:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                dt_central = dt.astimezone(ZoneInfo('America/Chicago'))
-                alternative_times.append(format_time_12h(dt_central.hour, dt_central.minute))
-
-            # Store all sorted times for swapping functionality
-            all_sorted_times = []
-            for timestamp, scores in sorted_times:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                dt_central = dt.astimezone(ZoneInfo('America/Chicago'))
-                all_sorted_times.append({
-                    'time': f"{dt_central.hour:02d}:{dt_central.minute:02d}",
-                    'formatted': format_time_12h(dt_central.hour, dt_central.minute),
-                    'washers': round(scores['washers']),
-                    'dryers': round(scores['dryers']),
-                    'score': round(scores['combined'] * 10) / 10
-                })
+        # Optional, paginated full ranking of every slot (used for swapping times)
+        include_all_times = request.args.get('includeAllTimes', 'false').lower() == 'true'
+        try:
+            all_times_offset = max(0, int(request.args.get('allTimesOffset', 0)))
+            all_times_limit = request.args.get('allTimesLimit')
+            all_times_limit = max(0, int(all_times_limit)) if all_times_limit else None
+        except ValueError:
+            return jsonify({'error': 'allTimesOffset and allTimesLimit must be integers'}), 400
+
+        # Multi-day constraints switch from per-day argmax to the DP solver
+        try:
+            min_gap_hours = float(request.args.get('minGapHours', 0))
+            dryer_delay_minutes = int(request.args.get('dryerDelayMinutes', 0))
+            consistency_weight = float(request.args.get('consistencyWeight', 0))
+        except ValueError:
+            return jsonify({'error': 'minGapHours, dryerDelayMinutes and consistencyWeight must be numbers'}), 400
+        booked_slots_str = request.args.get('bookedSlots')
+        try:
+            cycle_minutes = parse_cycle_minutes()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        use_solver = (
+            request.args.get('solver') == 'dp'
+            or min_gap_hours > 0 or dryer_delay_minutes > 0
+            or consistency_weight > 0 or bool(booked_slots_str)
+            or cycle_minutes is not None
+        )
+        stream = wants_ndjson()
+
+        if use_solver:
+            if not 0 <= min_gap_hours <= MAX_MIN_GAP_HOURS:
+                return jsonify({'error': f'minGapHours must be between 0 and {MAX_MIN_GAP_HOURS}'}), 400
+            if not 0 <= dryer_delay_minutes <= MAX_DRYER_DELAY_MINUTES:
+                return jsonify({'error': f'dryerDelayMinutes must be between 0 and {MAX_DRYER_DELAY_MINUTES}'}), 400
+            if not consistency_weight >= 0:
+                return jsonify({'error': 'consistencyWeight must not be negative'}), 400
+
+            booked_slots = set()
+            for booked in (booked_slots_str or '').split(','):
+                if booked:
+                    try:
+                        booked_time = datetime.strptime(booked.strip(), '%Y-%m-%dT%H:%M')
+                    except ValueError:
+                        return jsonify({'error': 'bookedSlots must be comma-separated YYYY-MM-DDTHH:MM times'}), 400
+                    booked_slots.add(slot_key(booked_time))
+
+            constraints = PlanConstraints(
+                time_windows={
+                    day: (constraint['start'], constraint['end'])
+                    for day, constraint in (day_time_constraints or {}).items()
+                },
+                booked_slots=booked_slots,
+                min_gap_minutes=int(min_gap_hours * 60),
+                consistency_weight=consistency_weight,
+            )
+
+            # The solver couples days, so every day is predicted up front
+            # (one batch per target type); entries are still formatted lazily
+            washer_values = predict_dates(str(hall), 'washers', candidate_dates)
+            dryer_values = predict_dates(str(hall), 'dryers', candidate_dates)
+            schedule_entries = iter_schedule(
+                candidate_dates, washer_values, dryer_values,
+                make_objective(algorithm_preference, dryer_delay_minutes, cycle_minutes), constraints,
+                include_all_times=include_all_times,
+                all_times_offset=all_times_offset,
+                all_times_limit=all_times_limit,
+            )
+        else:
+            # Score each laundry day from its aligned washer/dryer arrays.
+            # Streaming predicts a few days first so they go out early;
+            # otherwise every day is one batch per target type.
+            def iter_greedy_schedule():
+                chunk_days = STREAM_CHUNK_DAYS if stream else len(candidate_dates)
+                for day, washers, dryers in iter_predicted_days(str(hall), candidate_dates, chunk_days):
+                    time_window = None
+                    if day_time_constraints and sunday_weekday(day) in day_time_constraints:
+                        constraint = day_time_constraints[sunday_weekday(day)]
+                        time_window = (constraint['start'], constraint['end'])
+
+                    yield plan_day(
+                        day, washers, dryers, algorithm_preference,
+                        time_window=time_window,
+                        include_all_times=include_all_times,
+                        all_times_offset=all_times_offset,
+                        all_times_limit=all_times_limit,
+                    )
+
+            schedule_entries = iter_greedy_schedule()
+
+        def build_summary(valid_scores: List[float]) -> Dict:
+            average_availability = 0
+            if valid_scores:
+                average_availability = sum(valid_scores) / len(valid_scores)
 
             return {
-                'date': target_date.strftime('%Y-%m-%d'),
-                'dayOfWeek': day_of_week,
-                'bestTime': best_time,
-                'bestTimeFormatted': best_time_formatted,
-                'washersAvailable': round(best_scores['washers']),
-                'dryersAvailable': round(best_scores['dryers']),
-                'combinedScore': round(best_scores['combined'] * 10) / 10,
-                'alternativeTimes': alternative_times,
-                'allSortedTimes': all_sorted_times
+                'totalDays': len(candidate_dates),
+                'validDays': len(valid_scores),
+                'averageAvailability': round(average_availability * 10) / 10,
+                'constraintsApplied': day_time_constraints is not None,
+                'perDayConstraints': day_time_constraints is not None,
+                'solver': 'dp' if use_solver else 'greedy',
+                'mode': 'pipeline' if cycle_minutes is not None else 'same'
             }
 
-        # Generate schedule for all laundry days
-        schedule = []
-        for day in laundry_days:
-            schedule.append(find_best_time_for_day(day))
+        if stream:
+            # One record per day as soon as it is scored, then the summary
+            def generate():
+                valid_scores = []
+                for entry in schedule_entries:
+                    if entry['bestTime'] is not None:
+                        valid_scores.append(entry['combinedScore'])
+                    yield ndjson_record('day', entry)
+                yield ndjson_record('summary', build_summary(valid_scores))
+
+            return stream_ndjson(generate(), 'Schedule')
+
+        schedule = list(schedule_entries)
 
         # Calculate summary stats
-        valid_schedules = [s for s in schedule if s['bestTime'] is not None]
-        average_availability = 0
-        if valid_schedules:
-            average_availability = sum(s['combinedScore'] for s in valid_schedules) / len(valid_schedules)
-
-        summary = {
-            'totalDays': len(laundry_days),
-            'validDays': len(valid_schedules),
-            'averageAvailability': round(average_availability * 10) / 10,
-            'constraintsApplied': day_time_constraints is not None,
-            'perDayConstraints': day_time_constraints is not None
-        }
+        valid_scores = [s['combinedScore'] for s in schedule if s['bestTime'] is not None]
 
         return jsonify({
             'schedule': schedule,
-            'summary': summary
+            'summary': build_summary(valid_scores)
         })
 
     except Exception as e:
         print(f'Schedule error: {e}')
         traceback.print_exc()
         return jsonify({'error': 'Server error'}), 500
+
+
+# 7. GET /api/best-time/{hall} - Best remaining time today
+@api_bp.route('/best-time/<int:hall>', methods=['GET'])
+def get_best_time(hall):
+    """Best time to start laundry for the rest of today, from the cached day predictions"""
+    try:
+        algorithm_preference = request.args.get('algorithmPreference', 'balanced')
+        try:
+            cycle_minutes = parse_cycle_minutes()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        cached_predictions = get_cached_predictions(str(hall), 'day')
+        if not cached_predictions:
+            return jsonify({'error': 'Predictions not available yet'}), 503
+
+        # Only slots from the current one onward are still usable
+        horizon = cached_predictions.horizon
+        now = get_central_time()
+        current_slot = horizon.index_of(now)
+        if current_slot is None:
+            current_slot = len(horizon) if now.replace(tzinfo=None) >= horizon.start else 0
+        blocked = np.arange(len(horizon)) < current_slot
+
+        entry = best_time(
+            horizon.start.date(), cached_predictions.washers, cached_predictions.dryers,
+            make_objective(algorithm_preference, cycle_minutes=cycle_minutes), blocked,
+        )
+        entry['mode'] = 'pipeline' if cycle_minutes is not None else 'same'
+        if cycle_minutes is not None:
+            entry['cycleMinutes'] = cycle_minutes
+
+        return jsonify(entry)
+
+    except Exception as e:
+        print(f'Best time error: {e}')
+        traceback.print_exc()
+        return jsonify({'error': 'Server error'}), 500
@@ -0,0 +1,92 @@
+"""ASGI entry point for FAR Laundry Tool
+
+Serves the same Flask app, but prediction-bound requests (/api/forecast-date,
+/api/forecast-range and /api/schedule) first await their model predictions
+on the event loop, with the forecast store as the hand-off. By the time the
+request reaches the Flask handler its predictions are already stored, so it
+only formats the response. Slow model round-trips then wait concurrently
+without holding a thread, and cached endpoints such as /api/current keep
+their threads and their response shapes.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 8080 --workers 2
+"""
+import asyncio
+import os
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+from main import app as flask_app
+from utils.planner import schedule_days
+from utils.predict_range import apredict_dates, range_days
+
+# Threads running the Flask handlers (the same as gunicorn's --threads)
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', '8'))
+
+wsgi_app = WSGIMiddleware(flask_app, workers=ASGI_WSGI_THREADS)
+
+
+def prediction_dates(path: str, query_string: bytes) -> Optional[Tuple[str, List[date]]]:
+    """(hall, dates) a request will need predictions for, or None
+
+    Dates come from the same parsing helpers the Flask routes use. Requests
+    they reject return None and are left to the routes, which report the
+    error.
+    """
+    parts = path.strip('/').split('/')
+    if len(parts) < 3 or parts[0] != 'api' or not parts[2].isdigit():
+        return None
+
+    endpoint, hall = parts[1], parts[2]
+    query = {key: values[0] for key, values in parse_qs(query_string.decode('latin-1')).items()}
+
+    try:
+        if endpoint == 'forecast-date' and len(parts) == 4:
+            return hall, [datetime.strptime(parts[3], '%Y-%m-%d').date()]
+        if endpoint == 'forecast-range' and len(parts) == 3:
+            return hall, range_days(query)
+        if endpoint == 'schedule' and len(parts) == 3:
+            return hall, schedule_days(query)
+    except ValueError:
+        return None
+
+    return None
+
+
+async def prefetch_predictions(hall: str, dates: List[date]):
+    """Predict both target types for ``dates`` into the forecast store"""
+    await asyncio.gather(
+        apredict_dates(hall, 'washers', dates),
+        apredict_dates(hall, 'dryers', dates),
+    )
+
+
+async def lifespan(receive, send):
+    # Startup work (cache warm-up, refresh scheduler) runs when main is imported
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        needed = prediction_dates(scope['path'], scope.get('query_string', b''))
+        if needed:
+            try:
+                await prefetch_predictions(*needed)
+            except Exception as e:
+                # The Flask handler predicts synchronously whatever is still missing
+                print(f'[ASGI] Prediction prefetch failed: {e}')
+
+    await wsgi_app(scope, receive, send)
@@ -0,0 +1,197 @@
+"""Benchmark the API hot paths against the stub prediction backend
+
+Drives the Flask app through its test client, so no server or network is
+involved, and swaps Vertex AI for the deterministic stub backend with a
+configurable per-request latency. Reports p50/p95/p99 latency and
+throughput per endpoint, with caches cold (reset before every request)
+and warm, plus the time to generate the full prediction cache.
+
+Usage (from backend/):
+    python benchmarks/bench_api.py --latency-ms 150 --iterations 50 --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=100.0,
+                        help='simulated prediction latency per request (default: 100)')
+    parser.add_argument('--iterations', type=int, default=30,
+                        help='timed requests per endpoint and cache state (default: 30)')
+    parser.add_argument('--generate-iterations', type=int, default=3,
+                        help='timed full cache generations (default: 3)')
+    parser.add_argument('--hall', type=int, default=0)
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                        help='only run endpoints with this name (repeatable)')
+    parser.add_argument('--output', type=Path,
+                        help='write JSON results to this file instead of stdout')
+    return parser.parse_args()
+
+
+def configure_environment(args, work_dir: Path):
+    """Point the app at the stub backend and a throwaway cache directory
+
+    Must run before the app is imported, since configuration is read from
+    the environment at import time.
+    """
+    os.environ['PREDICTION_BACKEND'] = 'stub'
+    os.environ['STUB_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['CACHE_DIR'] = str(work_dir / 'cache')
+    os.environ['FORECAST_STORE_DIR'] = str(work_dir / 'cache' / 'forecasts')
+    os.environ['CACHE_REFRESH_ENABLED'] = 'false'
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def summarize(name: str, state: str, durations: List[float], elapsed: float) -> Dict:
+    """Latency percentiles (ms) and throughput for one series of timed calls"""
+    samples = np.array(durations) * 1000
+    return {
+        'name': name,
+        'state': state,
+        'iterations': len(durations),
+        'p50Ms': round(float(np.percentile(samples, 50)), 3),
+        'p95Ms': round(float(np.percentile(samples, 95)), 3),
+        'p99Ms': round(float(np.percentile(samples, 99)), 3),
+        'meanMs': round(float(samples.mean()), 3),
+        'maxMs': round(float(samples.max()), 3),
+        'throughputRps': round(len(durations) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def time_calls(call: Callable[[], None], iterations: int, reset: Optional[Callable[[], None]] = None) -> tuple:
+    """Time ``call`` repeatedly; ``reset`` runs untimed before each call"""
+    durations = []
+    elapsed = 0.0
+    for _ in range(iterations):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        call()
+        duration = time.perf_counter() - start
+        durations.append(duration)
+        elapsed += duration
+    return durations, elapsed
+
+
+def run_benchmarks(args) -> Dict:
+    """Run every benchmark and return the report"""
+    import main as server
+    from utils import cache
+    from utils.forecast_store import forecast_store
+    from utils.horizon import central_today
+
+    # The app starts a background warm-up on import; let it finish so it
+    # does not overlap the measurements
+    if cache._warmup_thread is not None:
+        cache._warmup_thread.join()
+
+    client = server.app.test_client()
+    hall = args.hall
+    today = central_today()
+    forecast_day = today + timedelta(days=30)
+    schedule_start = today + timedelta(days=1)
+
+    endpoints = {
+        'current': f'/api/current/{hall}',
+        'forecast': f'/api/forecast/{hall}',
+        'forecast-week': f'/api/forecast-week/{hall}',
+        'forecast-date': f'/api/forecast-date/{hall}/{forecast_day.isoformat()}',
+        'schedule': (
+            f'/api/schedule/{hall}?startDate={schedule_start.isoformat()}'
+            f'&endDate={(schedule_start + timedelta(days=27)).isoformat()}&frequencyDays=3'
+        ),
+    }
+    if args.endpoints:
+        endpoints = {name: url for name, url in endpoints.items() if name in args.endpoints}
+
+    def reset_caches():
+        # A fresh PredictionCache re-maps the cache file, so prepared bodies
+        # are serialized again; the forecast store is emptied in memory and on disk
+        cache.prediction_cache = cache.PredictionCache(cache.CACHE_FILE_PATH)
+        forecast_store.clear_memory()
+        shutil.rmtree(forecast_store.root, ignore_errors=True)
+
+    def remove_cache_file():
+        reset_caches()
+        cache.CACHE_FILE_PATH.unlink(missing_ok=True)
+
+    results = []
+
+    durations, elapsed = time_calls(
+        cache.generate_and_save_cache, args.generate_iterations, reset=remove_cache_file
+    )
+    results.append(summarize('generate_and_save_cache', 'cold', durations, elapsed))
+
+    for name, url in endpoints.items():
+        def request(url=url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} returned {response.status_code}')
+            response.get_data()
+
+        durations, elapsed = time_calls(request, args.iterations, reset=reset_caches)
+        results.append(summarize(name, 'cold', durations, elapsed))
+
+        request()
+        durations, elapsed = time_calls(request, args.iterations)
+        results.append(summarize(name, 'warm', durations, elapsed))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'backend': 'stub',
+            'latencyMs': args.latency_ms,
+            'iterations': args.iterations,
+            'generateIterations': args.generate_iterations,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def main():
+    args = parse_args()
+    work_dir = Path(tempfile.mkdtemp(prefix='far-bench-'))
+    configure_environment(args, work_dir)
+
+    # Server logging goes to stderr so stdout carries only the JSON report
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            report = run_benchmarks(args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = report['results']
+    print(f"{'endpoint':<26}{'state':<7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}",
+          file=sys.stderr)
+    for row in results:
+        print(f"{row['name']:<26}{row['state']:<7}{row['p50Ms']:>10.2f}{row['p95Ms']:>10.2f}"
+              f"{row['p99Ms']:>10.2f}{row['throughputRps'] or 0:>10.1f}", file=sys.stderr)
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(body + '\n')
+        print(f'[Bench] Results written to {args.output}', file=sys.stderr)
+    else:
+        print(body)
+
+
+if __name__ == '__main__':
+    main()
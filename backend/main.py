@@ -1,21 +1,35 @@
 """Flask backend for FAR Laundry Tool"""
 import os
+import time
 from pathlib import Path
-from dotenv import load_dotenv
+
+from utils.startup import StartupTimer
+
+startup = StartupTimer()
 
 # Load .env file FIRST before any other imports
-env_file = Path(__file__).parent / '.env'
-if env_file.exists():
-    print('[Server] Loading environment variables from .env file...')
-    load_dotenv(env_file)
-else:
-    print('[Server] No .env file found, using system environment variables')
+with startup.phase('load environment'):
+    from dotenv import load_dotenv
+
+    env_file = Path(__file__).parent / '.env'
+    if env_file.exists():
+        print('[Server] Loading environment variables from .env file...')
+        load_dotenv(env_file)
+    else:
+        print('[Server] No .env file found, using system environment variables')
 
 # Now import other modules that depend on environment variables
-from flask import Flask
-from flask_cors import CORS
-from api.routes import api_bp
-from utils.cache import is_cache_valid, generate_and_save_cache
+with startup.phase('import flask'):
+    from flask import Flask, Response, g, request
+    from flask_cors import CORS
+
+# The prediction backend (and the Vertex SDK) is not imported here; it is
+# loaded on the first prediction, which a warm cache may never need
+with startup.phase('import api and prediction utilities'):
+    from api.routes import api_bp
+    from utils import metrics
+    from utils.cache import get_cache_state, is_cache_warming, prediction_cache, start_cache_warmup
+    from utils.scheduler import start_refresh_scheduler
 
 app = Flask(__name__)
 
@@ -35,17 +49,48 @@ CORS(app, resources={
 # Register API blueprint
 app.register_blueprint(api_bp, url_prefix='/api')
 
-# Initialize prediction cache on startup
+# Initialize prediction cache on startup without blocking; any existing
+# cache file is served until the warm-up thread finishes
 print('[Server] Initializing prediction cache system...')
-if not is_cache_valid():
-    print('[Server] Cache is invalid or missing, generating fresh predictions...')
-    try:
-        generate_and_save_cache()
-    except Exception as e:
-        print(f'[Server] Error generating cache: {e}')
-        print('[Server] Will continue without cache, predictions will be generated on demand')
-else:
-    print('[Server] Cache is valid and up to date')
+with startup.phase('start cache warm-up'):
+    start_cache_warmup()
+
+# Regenerate the cache at Central-time midnight for long-lived instances
+if os.environ.get('CACHE_REFRESH_ENABLED', 'true').lower() == 'true':
+    with startup.phase('start refresh scheduler'):
+        start_refresh_scheduler()
+
+startup.report()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+
+    # Label by route template (not the raw path) to keep series bounded
+    labels = {
+        'route': request.url_rule.rule if request.url_rule else 'unmatched',
+        'method': request.method,
+        'status': response.status_code,
+    }
+
+    def observe():
+        metrics.http_request_duration.observe(time.perf_counter() - start, **labels)
+
+    if response.is_streamed:
+        # Streamed bodies (NDJSON) are produced after the handler returns;
+        # the server closes the response once the last chunk is sent
+        response.call_on_close(observe)
+    else:
+        observe()
+    return response
 
 
 @app.route('/')
@@ -58,6 +103,25 @@ def health():
     return {'status': 'healthy'}
 
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: ready once any cache (fresh or last-known-good) is loaded"""
+    state = get_cache_state()
+    snapshot = prediction_cache.snapshot()
+    body = {
+        'status': state,
+        'warming': is_cache_warming(),
+        'generatedAt': snapshot.generated_at if snapshot else None,
+    }
+    return body, (503 if state == 'cold' else 200)
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint (values are per worker process)"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=False)
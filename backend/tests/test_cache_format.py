@@ -0,0 +1,71 @@
+"""Round-trip and corruption checks for the binary prediction cache format"""
+import numpy as np
+import pytest
+
+from utils.cache_format import (
+    CacheFormatError,
+    array_views,
+    map_cache_file,
+    read_cache_header,
+    write_cache_file,
+)
+
+
+def write_sample(path):
+    arrays = [
+        (('0', 'day', 'washers'), np.array([0, 5, 12, 70000])),
+        (('0', 'day', 'dryers'), np.array([3, 0, -4])),
+        (('1', 'week', 'washers'), np.arange(2016)),
+    ]
+    write_cache_file(path, {'generatedDate': '2026-11-01', 'stepMinutes': 5}, arrays)
+    return arrays
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'predictions-cache.bin'
+    arrays = write_sample(path)
+
+    buffer = map_cache_file(path)
+    header, data_start = read_cache_header(buffer)
+    views = array_views(buffer, header, data_start)
+
+    assert header['generatedDate'] == '2026-11-01'
+    assert data_start % 8 == 0
+    assert set(views) == {key for key, _ in arrays}
+    # Values are clipped to the uint16 range
+    assert views[('0', 'day', 'washers')].tolist() == [0, 5, 12, 65535]
+    assert views[('0', 'day', 'dryers')].tolist() == [3, 0, 0]
+    assert views[('1', 'week', 'washers')].tolist() == list(range(2016))
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+@pytest.mark.parametrize('keep', [0, 6, 40])
+def test_truncated_header(tmp_path, keep):
+    path = tmp_path / 'predictions-cache.bin'
+    write_sample(path)
+    path.write_bytes(path.read_bytes()[:keep])
+
+    with pytest.raises(CacheFormatError):
+        read_cache_header(path.read_bytes())
+
+
+def test_truncated_data(tmp_path):
+    path = tmp_path / 'predictions-cache.bin'
+    write_sample(path)
+    path.write_bytes(path.read_bytes()[:-2])
+
+    buffer = path.read_bytes()
+    header, data_start = read_cache_header(buffer)
+    with pytest.raises(CacheFormatError):
+        array_views(buffer, header, data_start)
+
+
+def test_wrong_magic_and_version(tmp_path):
+    path = tmp_path / 'predictions-cache.bin'
+    write_sample(path)
+    data = path.read_bytes()
+
+    with pytest.raises(CacheFormatError, match='Not a prediction cache file'):
+        read_cache_header(b'JSON' + data[4:])
+    with pytest.raises(CacheFormatError, match='Unsupported cache format version'):
+        read_cache_header(data[:4] + b'\x09\x00' + data[6:])
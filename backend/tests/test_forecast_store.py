@@ -0,0 +1,89 @@
+"""Expiry and pruning of the forecast store"""
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+from utils.forecast_store import ForecastStore
+from utils.horizon import SLOTS_PER_DAY
+
+DAY = np.arange(SLOTS_PER_DAY)
+
+
+def stored_files(root):
+    return sorted(name for _, _, names in os.walk(root) for name in names)
+
+
+def age(store, key, seconds):
+    """Backdate a stored day's file by ``seconds``"""
+    path = store._path(key)
+    mtime = path.stat().st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_round_trip_through_disk(tmp_path):
+    store = ForecastStore(tmp_path, ttl=60, prune_interval=3600)
+    store.put_many('0', 'washers', 'v1', {date(2026, 11, 1): DAY})
+
+    store.clear_memory()
+    found = store.get_many('0', 'washers', 'v1', [date(2026, 11, 1), date(2026, 11, 2)])
+
+    assert list(found) == [date(2026, 11, 1)]
+    assert found[date(2026, 11, 1)].tolist() == DAY.tolist()
+    assert not found[date(2026, 11, 1)].flags.writeable
+    assert store.get_many('0', 'washers', 'v2', [date(2026, 11, 1)]) == {}
+
+
+def test_expired_disk_entries_are_misses(tmp_path):
+    store = ForecastStore(tmp_path, ttl=60, prune_interval=3600)
+    store.put_many('0', 'washers', 'v1', {date(2026, 11, 1): DAY, date(2026, 11, 2): DAY})
+    age(store, ('0', 'washers', 'v1', date(2026, 11, 1)), 120)
+
+    store.clear_memory()
+    found = store.get_many('0', 'washers', 'v1', [date(2026, 11, 1), date(2026, 11, 2)])
+
+    assert list(found) == [date(2026, 11, 2)]
+
+
+def test_memory_entries_expire_from_their_write_time(tmp_path):
+    store = ForecastStore(tmp_path, ttl=0.05, prune_interval=3600)
+    store.put_many('0', 'dryers', 'v1', {date(2026, 11, 1): DAY})
+    assert store.get_many('0', 'dryers', 'v1', [date(2026, 11, 1)])
+
+    time.sleep(0.1)
+
+    assert store.get_many('0', 'dryers', 'v1', [date(2026, 11, 1)]) == {}
+
+
+def test_prune_removes_expired_then_oldest_files(tmp_path):
+    store = ForecastStore(tmp_path, ttl=60, prune_interval=3600)
+    days = [date(2026, 11, day) for day in range(1, 5)]
+    store.put_many('0', 'washers', 'v1', {day: DAY for day in days})
+    store.max_files = 2
+    for index, day in enumerate(days):
+        age(store, ('0', 'washers', 'v1', day), 40 - index * 10)
+    age(store, ('0', 'washers', 'v1', days[0]), 100)
+
+    # One expired file, then the oldest of the rest until two are left
+    assert store.prune() == 2
+    assert stored_files(tmp_path) == ['2026-11-03.u16', '2026-11-04.u16']
+
+
+def test_prune_removes_retired_version_directories(tmp_path):
+    store = ForecastStore(tmp_path, ttl=60, prune_interval=3600)
+    store.put_many('0', 'washers', 'v1', {date(2026, 11, 1): DAY})
+    age(store, ('0', 'washers', 'v1', date(2026, 11, 1)), 120)
+    store.put_many('0', 'washers', 'v2', {date(2026, 11, 1): DAY})
+
+    store.prune()
+
+    assert os.listdir(tmp_path) == ['v2']
+
+
+def test_put_many_prunes_at_most_once_per_interval(tmp_path):
+    store = ForecastStore(tmp_path, ttl=60, max_files=1, prune_interval=3600)
+    store.put_many('0', 'washers', 'v1', {date(2026, 11, 1): DAY})
+    store.put_many('0', 'washers', 'v1', {date(2026, 11, 2): DAY, date(2026, 11, 3): DAY})
+
+    assert len(stored_files(tmp_path)) == 3
@@ -0,0 +1,102 @@
+"""Sharing of results and errors between concurrent single-flight callers"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute(keys):
+        calls.append(keys)
+        started.set()
+        release.wait(5)
+        return {key: key * 2 for key in keys}
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(flight.do_many, [1, 2], compute)
+        started.wait(5)
+        second = pool.submit(flight.do_many, [2], compute)
+        release.set()
+
+        assert first.result(5) == {1: 2, 2: 4}
+        assert second.result(5) == {2: 4}
+    assert calls == [[1, 2]]
+
+
+def test_error_reaches_waiting_callers_and_is_not_cached():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail(keys):
+        started.set()
+        release.wait(5)
+        raise RuntimeError('backend down')
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(flight.do_many, ['a'], fail)
+        started.wait(5)
+        second = pool.submit(flight.do, 'a', lambda: 'unused')
+        release.set()
+
+        with pytest.raises(RuntimeError, match='backend down'):
+            first.result(5)
+        with pytest.raises(RuntimeError, match='backend down'):
+            second.result(5)
+
+    # The failed call is forgotten, so the next caller computes again
+    assert flight.do('a', lambda: 'ok') == 'ok'
+
+
+def test_async_error_reaches_waiting_callers():
+    flight = AsyncSingleFlight()
+
+    async def fail(keys):
+        await asyncio.sleep(0.01)
+        raise RuntimeError('backend down')
+
+    async def main():
+        results = await asyncio.gather(
+            flight.do_many(['a', 'b'], fail),
+            flight.do_many(['b'], fail),
+            return_exceptions=True,
+        )
+        retry = await flight.do_many(['b'], _double)
+        return results, retry
+
+    results, retry = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retry == {'b': 'bb'}
+
+
+async def _double(keys):
+    return {key: key * 2 for key in keys}
+
+
+def test_async_cancelled_waiter_does_not_cancel_the_owner():
+    flight = AsyncSingleFlight()
+
+    async def compute(keys):
+        await asyncio.sleep(0.05)
+        return {key: len(key) for key in keys}
+
+    async def main():
+        owner = asyncio.create_task(flight.do_many(['abc'], compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do_many(['abc'], compute))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await owner
+
+    assert asyncio.run(main()) == {'abc': 3}
@@ -0,0 +1,89 @@
+"""Brute-force checks for the multi-day schedule solver"""
+import itertools
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from utils.horizon import SLOTS_PER_DAY, STEP_MINUTES
+from utils.solver import RUN_BONUS, PlanConstraints, solve
+
+
+def plan_value(days, scores, constraints, plan):
+    """Solver objective of ``plan``, or None when it breaks the minimum gap"""
+    gap_slots = math.ceil(constraints.min_gap_minutes / STEP_MINUTES)
+    value = 0.0
+    previous = None
+    for day, day_scores, slot in zip(days, scores, plan):
+        if slot is None:
+            continue
+        if not np.isfinite(day_scores[slot]):
+            return None
+        value += day_scores[slot] + RUN_BONUS
+        if previous is not None:
+            previous_day, previous_slot = previous
+            if (day - previous_day).days * SLOTS_PER_DAY + slot - previous_slot < gap_slots:
+                return None
+            value -= constraints.consistency_weight * abs(slot - previous_slot) * STEP_MINUTES / 60
+        previous = (day, slot)
+    return value
+
+
+def brute_force(days, scores, constraints):
+    """Best objective value over every combination of usable slots"""
+    choices = [[None] + np.flatnonzero(np.isfinite(day_scores)).tolist() for day_scores in scores]
+    values = (plan_value(days, scores, constraints, plan) for plan in itertools.product(*choices))
+    return max(value for value in values if value is not None)
+
+
+def random_case(rng):
+    """A few days with a handful of usable slots each, so brute force stays small"""
+    day_count = int(rng.integers(1, 5))
+    offsets = np.cumsum(rng.integers(1, 3, size=day_count)) - 1
+    days = [date(2026, 11, 1) + timedelta(days=int(offset)) for offset in offsets]
+
+    scores = []
+    for _ in days:
+        day_scores = np.full(SLOTS_PER_DAY, -np.inf)
+        usable = rng.choice(SLOTS_PER_DAY, size=int(rng.integers(0, 4)), replace=False)
+        day_scores[usable] = rng.integers(0, 30, size=len(usable))
+        scores.append(day_scores)
+
+    constraints = PlanConstraints(
+        min_gap_minutes=int(rng.choice([0, 6 * 60, 24 * 60, 36 * 60, 48 * 60])),
+        consistency_weight=float(rng.choice([0.0, 0.5, 3.0])),
+    )
+    return days, scores, constraints
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_solve_matches_brute_force(seed):
+    days, scores, constraints = random_case(np.random.default_rng(seed))
+
+    plan = solve(days, scores, constraints)
+
+    assert len(plan) == len(days)
+    value = plan_value(days, scores, constraints, plan)
+    assert value is not None
+    assert value == pytest.approx(brute_force(days, scores, constraints), abs=1e-6)
+
+
+def test_solve_keeps_every_feasible_day_over_a_better_score():
+    days = [date(2026, 11, 1), date(2026, 11, 2)]
+    scores = [np.full(SLOTS_PER_DAY, -np.inf) for _ in days]
+    scores[0][[10, 200]] = [1, 100]
+    scores[1][20] = 1
+
+    # Slot 200 is best alone, but only slot 10 leaves a 20-hour gap before day two
+    constraints = PlanConstraints(min_gap_minutes=20 * 60)
+
+    assert solve(days, scores, constraints) == [10, 20]
+
+
+def test_solve_without_usable_slots():
+    days = [date(2026, 11, 1)]
+    scores = [np.full(SLOTS_PER_DAY, -np.inf)]
+
+    assert solve(days, scores, PlanConstraints()) == [None]
+    assert solve([], [], PlanConstraints()) == []
@@ -0,0 +1,303 @@
+"""Pluggable prediction backends
+
+Every backend takes an (n, 7) feature matrix in training order
+(hall, month, weekday, hour, minute, year, day) and returns one predicted
+value per row. The backend is chosen with the PREDICTION_BACKEND
+environment variable:
+
+    vertex  - deployed Vertex AI endpoints (default)
+    local   - pickled models loaded from LOCAL_MODEL_DIR, predicted in-process
+    stub    - deterministic stand-in for offline development and testing
+"""
+import asyncio
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from . import metrics
+
+PREDICTION_BACKEND = os.environ.get('PREDICTION_BACKEND', 'vertex')
+
+# Local models are stored as <target_type>.pkl, e.g. models/washers.pkl. The
+# image does not ship models (.dockerignore), so either mount LOCAL_MODEL_DIR
+# or let missing models be downloaded from GCS_BUCKET_NAME on first use
+LOCAL_MODEL_DIR = Path(os.environ.get('LOCAL_MODEL_DIR', Path(__file__).parent.parent / 'models'))
+
+# Bucket and object prefix holding <target_type>.pkl for local models
+GCS_BUCKET_NAME = os.environ.get('GCS_BUCKET_NAME')
+GCS_MODEL_PREFIX = os.environ.get('GCS_MODEL_PREFIX', '')
+
+# Overrides the backend-derived model version used to key stored forecasts
+MODEL_VERSION = os.environ.get('MODEL_VERSION')
+
+# Artificial per-call latency for the stub backend, in milliseconds
+STUB_LATENCY_MS = float(os.environ.get('STUB_LATENCY_MS', '0'))
+
+
+class PredictionBackend:
+    """Base class for prediction backends"""
+    name = 'base'
+
+    # Largest number of rows sent in one predict() call, or None for no limit
+    max_batch_rows = None
+
+    def predict(self, target_type, features):
+        """Predict one value per feature row
+
+        Args:
+            target_type: 'washers' or 'dryers'
+            features: (n, 7) int64 array of feature rows in training order
+
+        Returns:
+            sequence of n predicted values (floats)
+        """
+        raise NotImplementedError
+
+    async def apredict(self, target_type, features):
+        """Async predict(); by default runs predict() in a worker thread
+
+        Backends whose predictions wait on I/O override this so that waiting
+        does not occupy a thread.
+        """
+        return await asyncio.to_thread(self.predict, target_type, features)
+
+    def model_version(self, target_type):
+        """Identifier that changes whenever the model behind target_type changes"""
+        return self.name
+
+
+class LocalModelBackend(PredictionBackend):
+    """Predicts in-process with models loaded from LOCAL_MODEL_DIR
+
+    Each model is any pickled object with a scikit-learn style
+    ``predict(rows)`` method, loaded on first use. A model missing from
+    LOCAL_MODEL_DIR is downloaded from GCS_BUCKET_NAME when that is set.
+    """
+    name = 'local'
+
+    def __init__(self, model_dir=LOCAL_MODEL_DIR, bucket_name=GCS_BUCKET_NAME):
+        self.model_dir = Path(model_dir)
+        self.bucket_name = bucket_name
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def check_models(self):
+        """Report at selection time when models are neither present nor fetchable"""
+        missing = [target for target in ('washers', 'dryers')
+                   if not (self.model_dir / f'{target}.pkl').exists()]
+        if missing and not self.bucket_name:
+            print(f'[Local] ERROR: no {", ".join(missing)} model in {self.model_dir} and GCS_BUCKET_NAME '
+                  f'is not set; mount LOCAL_MODEL_DIR or set GCS_BUCKET_NAME')
+        elif missing:
+            print(f'[Local] {", ".join(missing)} model(s) will be downloaded from gs://{self.bucket_name}')
+
+    def _model_path(self, target_type) -> Path:
+        """Path of the model file, downloading it first if it is missing"""
+        model_path = self.model_dir / f'{target_type}.pkl'
+        if model_path.exists() or not self.bucket_name:
+            return model_path
+
+        with self._lock:
+            if not model_path.exists():
+                # Imported here: only deployments that fetch models need the GCS client
+                # (installed with google-cloud-aiplatform)
+                from google.cloud import storage
+
+                start = time.perf_counter()
+                blob_name = f'{GCS_MODEL_PREFIX}{target_type}.pkl'
+                self.model_dir.mkdir(parents=True, exist_ok=True)
+                # Download next to the target and rename so readers never see a partial file
+                tmp_path = model_path.with_suffix(f'.{os.getpid()}.tmp')
+                storage.Client().bucket(self.bucket_name).blob(blob_name).download_to_filename(str(tmp_path))
+                os.replace(tmp_path, model_path)
+                print(f'[Local] Downloaded gs://{self.bucket_name}/{blob_name} '
+                      f'({(time.perf_counter() - start) * 1000:.0f} ms)')
+        return model_path
+
+    def _get_model(self, target_type):
+        model = self._models.get(target_type)
+        if model is not None:
+            return model
+
+        model_path = self._model_path(target_type)
+        with self._lock:
+            if target_type not in self._models:
+                with open(model_path, 'rb') as f:
+                    self._models[target_type] = pickle.load(f)
+                print(f'[Local] Loaded {target_type} model from {model_path}')
+            return self._models[target_type]
+
+    def model_version(self, target_type):
+        try:
+            stat = self._model_path(target_type).stat()
+        except Exception as e:
+            print(f'[Local] {target_type} model unavailable: {e}')
+            return f'{self.name}-missing'
+        return f'{self.name}-{int(stat.st_mtime)}-{stat.st_size}'
+
+    def predict(self, target_type, features):
+        model = self._get_model(target_type)
+        return np.asarray(model.predict(features), dtype=np.float64)
+
+
+class StubBackend(PredictionBackend):
+    """Deterministic stand-in that needs no model or network
+
+    Availability follows a smooth daily curve (busiest in the evening,
+    quieter on weekends) so forecasts and schedules look plausible.
+    """
+    name = 'stub'
+
+    CAPACITY = {'washers': 12, 'dryers': 14}
+
+    def __init__(self, latency_ms=STUB_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def model_version(self, target_type):
+        return f'{self.name}-1'
+
+    def predict(self, target_type, features):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._curve(target_type, features)
+
+    async def apredict(self, target_type, features):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._curve(target_type, features)
+
+    def _curve(self, target_type, features):
+        capacity = self.CAPACITY[target_type]
+        hall, weekday, hour, minute = features[:, 0], features[:, 2], features[:, 3], features[:, 4]
+        phase = 2 * np.pi * ((hour * 60 + minute) / 1440 - 19 / 24)
+        busy = 0.35 * (1 + np.cos(phase))
+        busy = np.where(weekday >= 5, busy * 0.6, busy)
+        return capacity * (1 - busy) - hall
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name):
+    """Instantiate a prediction backend by name"""
+    if name == 'vertex':
+        from .vertex_predict import VertexBackend
+        return VertexBackend()
+    if name == 'local':
+        backend = LocalModelBackend()
+        backend.check_models()
+        return backend
+    if name == 'stub':
+        return StubBackend()
+    raise ValueError(f'Unknown prediction backend: {name}')
+
+
+def get_backend():
+    """Get the process-wide prediction backend selected by PREDICTION_BACKEND"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(PREDICTION_BACKEND)
+                print(f'[Predict] Using {_backend.name} prediction backend')
+    return _backend
+
+
+def get_model_version(target_type):
+    """Model version for target_type, honoring the MODEL_VERSION override"""
+    return MODEL_VERSION or get_backend().model_version(target_type)
+
+
+def batch_predict(target_type, features):
+    """Send a feature matrix to the configured prediction backend.
+
+    Args:
+        target_type: 'washers' or 'dryers'
+        features: (n, 7) int64 array from Horizon.features
+
+    Batches larger than the backend's max_batch_rows are sent as several
+    consecutive requests.
+
+    Returns:
+        float64 array of n predicted values
+    """
+    if len(features) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    backend = get_backend()
+    chunk_rows = backend.max_batch_rows or len(features)
+
+    # Split large batches into requests the backend can accept
+    chunks = [
+        _timed_predict(backend, target_type, features[i:i + chunk_rows])
+        for i in range(0, len(features), chunk_rows)
+    ]
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+async def abatch_predict(target_type, features):
+    """Async batch_predict: chunks are sent concurrently and awaited together"""
+    if len(features) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    backend = get_backend()
+    chunk_rows = backend.max_batch_rows or len(features)
+
+    chunks = await asyncio.gather(*(
+        _atimed_predict(backend, target_type, features[i:i + chunk_rows])
+        for i in range(0, len(features), chunk_rows)
+    ))
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+async def _atimed_predict(backend, target_type, features):
+    """Async _timed_predict"""
+    labels = {'backend': backend.name, 'target': target_type}
+    metrics.predict_rows.observe(len(features), **labels)
+    try:
+        with metrics.predict_duration.time(**labels):
+            return np.asarray(await backend.apredict(target_type, features), dtype=np.float64)
+    except Exception:
+        metrics.predict_failures.inc(**labels)
+        raise
+
+
+def _timed_predict(backend, target_type, features):
+    """One backend request, recorded in the prediction metrics"""
+    labels = {'backend': backend.name, 'target': target_type}
+    metrics.predict_rows.observe(len(features), **labels)
+    try:
+        with metrics.predict_duration.time(**labels):
+            return np.asarray(backend.predict(target_type, features), dtype=np.float64)
+    except Exception:
+        metrics.predict_failures.inc(**labels)
+        raise
+
+
+def batch_predict_unique(target_type, feature_batches):
+    """Predict several feature matrices with one request, sending each distinct row once.
+
+    Rows that appear in more than one batch (or more than once in a batch)
+    are predicted a single time and the result is shared.
+
+    Args:
+        target_type: 'washers' or 'dryers'
+        feature_batches: list of feature matrices, as accepted by batch_predict
+
+    Returns:
+        list of predicted value arrays, one per input batch
+    """
+    if not feature_batches:
+        return []
+
+    stacked = np.concatenate(feature_batches)
+    unique_rows, inverse = np.unique(stacked, axis=0, return_inverse=True)
+    predicted_values = batch_predict(target_type, unique_rows)[inverse.reshape(-1)]
+
+    splits = np.cumsum([len(batch) for batch in feature_batches])[:-1]
+    return np.split(predicted_values, splits)
@@ -1,16 +1,264 @@
 """Prediction cache management"""
-import json
-from datetime import datetime
+import fcntl
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from zoneinfo import ZoneInfo
-from typing import Dict, List, Optional
+from typing import Any, Dict, Optional, Tuple
 
-from .predict import predict_day
-from .predict_week import predict_week
+import numpy as np
+
+from . import metrics
+from .backends import batch_predict_unique
+from .cache_format import array_views, map_cache_file, read_cache_header, write_cache_file
+from .horizon import STEP_MINUTES, Horizon, central_now, central_today, format_predictions, postprocess
+from .resolutions import BASE_RESOLUTION, aggregate_columnar, aggregate_predictions, downsample_to
+from .responses import PreparedResponse, array_stats, columnar_series, prepare_json, series_predictions
 
 # Cache file path
-CACHE_DIR = Path(__file__).parent.parent / 'cache'
-CACHE_FILE_PATH = CACHE_DIR / 'predictions-cache.json'
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', Path(__file__).parent.parent / 'cache'))
+CACHE_FILE_PATH = CACHE_DIR / 'predictions-cache.bin'
+
+# Lock file electing the single worker process that generates the cache
+CACHE_LOCK_PATH = CACHE_DIR / '.generate.lock'
+
+# How often (seconds) readers re-stat the cache file for changes
+CACHE_CHECK_INTERVAL = float(os.environ.get('CACHE_CHECK_INTERVAL', '1.0'))
+
+# Maximum number of prediction requests in flight during cache generation
+CACHE_PREDICT_CONCURRENCY = int(os.environ.get('CACHE_PREDICT_CONCURRENCY', '4'))
+
+HALLS = ('0', '1')  # Oglesby and Trelease
+TARGET_TYPES = ('washers', 'dryers')
+HORIZONS = ('day', 'week')
+
+
+@dataclass(frozen=True)
+class HorizonPredictions:
+    """Cached washer and dryer predictions for one hall and horizon
+
+    ``washers`` and ``dryers`` are aligned with ``horizon``, so the value for
+    any wall-clock time is a single array index. Response bodies (the merged
+    forecast, its columnar variant and every downsampled resolution) are
+    serialized the first time each is requested and then reused, so loading
+    a snapshot only wraps its arrays and requests never re-serialize.
+    """
+    horizon: Horizon
+    washers: np.ndarray
+    dryers: np.ndarray
+    _prepared: Dict[Tuple[str, bool], Optional[PreparedResponse]] = field(
+        init=False, default_factory=dict, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock, repr=False, compare=False)
+
+    def prepared(self, resolution: str = BASE_RESOLUTION, columnar: bool = False) -> Optional[PreparedResponse]:
+        """Prepared response for a resolution and format, or None if not available"""
+        key = (resolution, columnar)
+        if key not in self._prepared:
+            with self._lock:
+                if key not in self._prepared:
+                    self._prepared[key] = self._prepare(resolution, columnar)
+        return self._prepared[key]
+
+    def _prepare(self, resolution: str, columnar: bool) -> Optional[PreparedResponse]:
+        if resolution == BASE_RESOLUTION:
+            if columnar:
+                body = columnar_series(self.horizon, self.washers, self.dryers)
+            else:
+                body = {'predictions': series_predictions(self.horizon, self.washers, self.dryers)}
+        else:
+            level = downsample_to(self.horizon, self.washers, self.dryers, resolution)
+            if level is None:
+                return None
+            horizon, columns = level
+            if columnar:
+                body = aggregate_columnar(horizon, columns)
+            else:
+                body = {'predictions': aggregate_predictions(horizon, columns)}
+
+        body['stats'] = array_stats(self.washers, self.dryers)
+        return prepare_json(body)
+
+    def value_at(self, dt: datetime) -> Tuple[int, int]:
+        """Return (washers, dryers) for the slot containing ``dt``, or zeros"""
+        index = self.horizon.index_of(dt)
+        if index is None:
+            return 0, 0
+        return int(self.washers[index]), int(self.dryers[index])
+
+
+@dataclass(frozen=True)
+class CacheSnapshot:
+    """Immutable, fully parsed view of the prediction cache
+
+    ``buffer`` keeps the memory-mapped file alive for as long as the
+    snapshot's arrays (views into it) are in use.
+    """
+    generated_at: str
+    generated_date: str
+    halls: Dict[str, Dict[str, HorizonPredictions]]
+    buffer: Any = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def load(cls, path: Path) -> 'CacheSnapshot':
+        """Memory-map a cache file and wrap its arrays without copying"""
+        buffer = map_cache_file(path)
+        header, data_start = read_cache_header(buffer)
+        return cls.from_buffer(buffer, header, data_start)
+
+    @classmethod
+    def from_buffer(cls, buffer, header: Dict, data_start: int) -> 'CacheSnapshot':
+        views = array_views(buffer, header, data_start)
+        step = header.get('stepMinutes', STEP_MINUTES)
+        horizons = {
+            name: Horizon(datetime.fromisoformat(info['start']), info['periods'], step)
+            for name, info in header.get('horizons', {}).items()
+        }
+
+        halls = {}
+        for hall, horizon_name, _ in views:
+            if horizon_name in halls.setdefault(hall, {}):
+                continue
+            halls[hall][horizon_name] = HorizonPredictions(
+                horizon=horizons[horizon_name],
+                washers=views[(hall, horizon_name, 'washers')],
+                dryers=views[(hall, horizon_name, 'dryers')],
+            )
+
+        return cls(
+            generated_at=header.get('generatedAt', ''),
+            generated_date=header.get('generatedDate', ''),
+            halls=halls,
+            buffer=buffer,
+        )
+
+    def save(self, path: Path):
+        """Atomically write the snapshot as a binary cache file"""
+        horizons = {}
+        arrays = []
+        for hall, hall_data in self.halls.items():
+            for horizon_name, entry in hall_data.items():
+                horizons[horizon_name] = {
+                    'start': entry.horizon.start.isoformat(timespec='minutes'),
+                    'periods': entry.horizon.periods,
+                }
+                arrays.append(((hall, horizon_name, 'washers'), entry.washers))
+                arrays.append(((hall, horizon_name, 'dryers'), entry.dryers))
+
+        header = {
+            'generatedAt': self.generated_at,
+            'generatedDate': self.generated_date,
+            'stepMinutes': STEP_MINUTES,
+            'horizons': horizons,
+        }
+        write_cache_file(path, header, arrays)
+
+    def to_dict(self) -> Dict:
+        """Expand to the legacy {timestamp, value} JSON structure"""
+        return {
+            'generatedAt': self.generated_at,
+            'generatedDate': self.generated_date,
+            'halls': {
+                hall: {
+                    horizon: {
+                        'washers': format_predictions(entry.horizon, entry.washers),
+                        'dryers': format_predictions(entry.horizon, entry.dryers),
+                    }
+                    for horizon, entry in hall_data.items()
+                }
+                for hall, hall_data in self.halls.items()
+            }
+        }
+
+
+class PredictionCache:
+    """Process-resident prediction cache backed by the cache file.
+
+    The file is memory-mapped once and kept as an immutable snapshot.
+    Readers re-stat the file at most every ``check_interval`` seconds and
+    only re-map it when its mtime changes; the snapshot is only replaced
+    when the reloaded data has a different generation stamp. Snapshots are
+    swapped by reference, so reads never block on a reload.
+    """
+
+    def __init__(self, path: Path, check_interval: float = CACHE_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CacheSnapshot] = None
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+
+    def snapshot(self) -> Optional[CacheSnapshot]:
+        """Return the current snapshot, reloading it if the file changed"""
+        if time.monotonic() < self._next_check:
+            return self._snapshot
+
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.check_interval
+                self._reload_if_changed()
+            return self._snapshot
+
+    def install(self, snapshot: CacheSnapshot):
+        """Replace the in-memory snapshot with one generated in this process"""
+        with self._lock:
+            self._snapshot = snapshot
+            self._mtime = self._stat_mtime()
+            self._next_check = time.monotonic() + self.check_interval
+
+    def invalidate(self):
+        """Force the next read to re-check the cache file"""
+        with self._lock:
+            self._next_check = 0.0
+
+    def _stat_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        mtime = self._stat_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+
+        with metrics.cache_reload_duration.time():
+            result = self._reload(mtime)
+        metrics.cache_reloads.inc(result=result)
+
+    def _reload(self, mtime: float) -> str:
+        try:
+            buffer = map_cache_file(self.path)
+            header, data_start = read_cache_header(buffer)
+        except Exception as e:
+            print(f'Error loading cache: {e}')
+            return 'error'
+
+        self._mtime = mtime
+        current = self._snapshot
+        if (
+            current is not None
+            and current.generated_at == header.get('generatedAt')
+            and current.generated_date == header.get('generatedDate')
+        ):
+            buffer.close()
+            return 'unchanged'
+
+        try:
+            self._snapshot = CacheSnapshot.from_buffer(buffer, header, data_start)
+        except Exception as e:
+            print(f'Error loading cache: {e}')
+            return 'error'
+        print(f'[Cache] Loaded predictions generated at {self._snapshot.generated_at}')
+        return 'loaded'
+
+
+prediction_cache = PredictionCache(CACHE_FILE_PATH)
 
 
 def ensure_cache_dir():
@@ -18,83 +266,211 @@ def ensure_cache_dir():
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def is_cache_valid() -> bool:
-    """Check if cache file exists and is from today (Central Time)"""
-    try:
-        if not CACHE_FILE_PATH.exists():
+class CacheGenerationLock:
+    """Exclusive file lock held by whichever process is generating the cache
+
+    Gunicorn workers share the cache directory; the worker holding this
+    lock generates and writes the cache, while the others wait (or skip)
+    and pick up the new file through PredictionCache's mtime check. The
+    lock is released automatically if its holder dies.
+    """
+
+    def __init__(self, path: Path = CACHE_LOCK_PATH):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self._file is not None:
+            return True
+
+        ensure_cache_dir()
+        lock_file = open(self.path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            lock_file.close()
             return False
+        self._file = lock_file
+        return True
 
-        with open(CACHE_FILE_PATH, 'r') as f:
-            cache = json.load(f)
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
 
-        # Get today's date in Central Time
-        now_central = datetime.now(ZoneInfo('America/Chicago'))
-        today_date = now_central.strftime('%Y-%m-%d')
+    def __enter__(self):
+        self.acquire()
+        return self
 
-        # Check if cache is from today
-        return cache.get('generatedDate') == today_date
-    except Exception as e:
-        print(f'Error checking cache validity: {e}')
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def get_today_central() -> str:
+    """Get today's date (YYYY-MM-DD) in Central Time"""
+    return central_today().isoformat()
+
+
+def is_cache_valid() -> bool:
+    """Check if cache file exists and is from today (Central Time)"""
+    snapshot = prediction_cache.snapshot()
+    if snapshot is None:
         return False
 
+    # Check if cache is from today
+    return snapshot.generated_date == get_today_central()
 
-def load_cache() -> Optional[Dict]:
-    """Load cache from file"""
+
+def get_cache_state() -> str:
+    """Describe the cache being served
+
+    Returns:
+        'warm' if today's predictions are loaded, 'stale' if only an older
+        (last-known-good) cache is available, 'cold' if there is none
+    """
+    snapshot = prediction_cache.snapshot()
+    if snapshot is None:
+        return 'cold'
+    return 'warm' if snapshot.generated_date == get_today_central() else 'stale'
+
+
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_lock = threading.Lock()
+
+
+def _warm_cache():
     try:
-        with open(CACHE_FILE_PATH, 'r') as f:
-            return json.load(f)
+        if is_cache_valid():
+            print('[Cache] Cache is valid and up to date')
+            return
+        print('[Cache] Cache is invalid or missing, generating fresh predictions in background...')
+        generate_and_save_cache()
     except Exception as e:
-        print(f'Error loading cache: {e}')
-        return None
+        print(f'[Cache] Error generating cache: {e}')
+        print('[Cache] Continuing with last-known-good cache, if any')
 
 
-def generate_and_save_cache():
-    """Generate all predictions and save to cache"""
-    print('[Cache] Generating fresh predictions...')
+def start_cache_warmup() -> threading.Thread:
+    """Make sure today's cache exists without blocking the caller
 
-    ensure_cache_dir()
+    Generation runs in a daemon thread; until it finishes, readers keep
+    getting whatever cache file is already on disk.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            _warmup_thread = threading.Thread(target=_warm_cache, name='cache-warmup', daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
 
-    halls = ['0', '1']  # Oglesby and Trelease
-    target_types = ['washers', 'dryers']
 
-    now_central = datetime.now(ZoneInfo('America/Chicago'))
+def is_cache_warming() -> bool:
+    """Whether a background warm-up is still running"""
+    thread = _warmup_thread
+    return thread is not None and thread.is_alive()
 
-    cache_data = {
-        'generatedAt': now_central.isoformat(),
-        'generatedDate': now_central.strftime('%Y-%m-%d'),
-        'halls': {}
-    }
 
-    # Generate predictions for each hall
-    for hall in halls:
-        print(f'[Cache] Generating predictions for hall {hall}...')
+def load_cache() -> Optional[Dict]:
+    """Load cache as a plain dict"""
+    snapshot = prediction_cache.snapshot()
+    if snapshot is None:
+        return None
+    return snapshot.to_dict()
 
-        hall_predictions = {
-            'day': {'washers': [], 'dryers': []},
-            'week': {'washers': [], 'dryers': []}
-        }
 
-        # Generate day and week predictions for washers and dryers
-        for target_type in target_types:
-            print(f'[Cache]   - {target_type} (day)...')
-            day_predictions = predict_day(hall, target_type)
-            hall_predictions['day'][target_type] = day_predictions
+def build_cache_snapshot(for_date: Optional[date] = None) -> CacheSnapshot:
+    """Generate all predictions for ``for_date`` (default: today) without touching the live cache
 
-            print(f'[Cache]   - {target_type} (week)...')
-            week_predictions = predict_week(hall, target_type)
-            hall_predictions['week'][target_type] = week_predictions
+    The week horizon is the Monday-Sunday week containing ``for_date``, so
+    building for a Monday rolls the week forward.
+    """
+    now_central = central_now()
+    for_date = for_date or now_central.date()
+    print(f'[Cache] Generating fresh predictions for {for_date.isoformat()}...')
+
+    # The day is a subset of the week, so each hall/target needs only one
+    # request; rows shared between horizons are predicted once
+    day_horizon = Horizon.for_day(for_date)
+    week_horizon = Horizon.for_week(for_date)
+
+    with metrics.cache_generation_duration.time(phase='features'):
+        features = {
+            hall: (day_horizon.features(hall), week_horizon.features(hall))
+            for hall in HALLS
+        }
 
-        cache_data['halls'][hall] = hall_predictions
+    def predict_job(hall, target_type):
+        print(f'[Cache]   - hall {hall} {target_type} (day + week)...')
+        day_features, week_features = features[hall]
+        return batch_predict_unique(target_type, [day_features, week_features])
+
+    # Prediction requests are independent, so send them concurrently
+    jobs = [(hall, target_type) for hall in HALLS for target_type in TARGET_TYPES]
+    with metrics.cache_generation_duration.time(phase='predict'):
+        with ThreadPoolExecutor(max_workers=max(1, CACHE_PREDICT_CONCURRENCY)) as executor:
+            futures = {job: executor.submit(predict_job, *job) for job in jobs}
+            results = {job: future.result() for job, future in futures.items()}
+
+    # Assemble per-hall results (this also prepares the response payloads)
+    with metrics.cache_generation_duration.time(phase='assemble'):
+        halls = {}
+        for hall in HALLS:
+            washer_day, washer_week = results[(hall, 'washers')]
+            dryer_day, dryer_week = results[(hall, 'dryers')]
+            halls[hall] = {
+                'day': HorizonPredictions(day_horizon, postprocess(washer_day), postprocess(dryer_day)),
+                'week': HorizonPredictions(week_horizon, postprocess(washer_week), postprocess(dryer_week)),
+            }
+
+    return CacheSnapshot(
+        generated_at=now_central.isoformat(),
+        generated_date=for_date.isoformat(),
+        halls=halls,
+    )
+
+
+def save_and_install_snapshot(snapshot: CacheSnapshot):
+    """Atomically replace the cache file and the in-memory snapshot
+
+    The file is written to a temporary path and renamed over the live one,
+    so readers never see a partially written cache.
+    """
+    ensure_cache_dir()
 
-    # Save to file
     print('[Cache] Saving predictions to cache file...')
-    with open(CACHE_FILE_PATH, 'w') as f:
-        json.dump(cache_data, f, indent=2)
+    with metrics.cache_generation_duration.time(phase='save'):
+        snapshot.save(CACHE_FILE_PATH)
+
+    prediction_cache.install(snapshot)
+
+
+def generate_and_save_cache(for_date: Optional[date] = None):
+    """Generate all predictions and save to cache
+
+    Only one process generates at a time. A process that had to wait for
+    the lock first re-reads the cache file and skips generation if the
+    holder already produced the requested day.
+    """
+    for_date = for_date or central_today()
+
+    with CacheGenerationLock():
+        prediction_cache.invalidate()
+        snapshot = prediction_cache.snapshot()
+        if snapshot is not None and snapshot.generated_date == for_date.isoformat():
+            print('[Cache] Cache was generated by another worker')
+            return
+
+        save_and_install_snapshot(build_cache_snapshot(for_date))
 
     print('[Cache] Cache generation complete!')
 
 
-def get_cached_predictions(hall: str, prediction_type: str) -> Optional[Dict[str, List]]:
+def get_cached_predictions(hall: str, prediction_type: str) -> Optional[HorizonPredictions]:
     """Get cached predictions for a specific hall and type
 
     Args:
@@ -102,16 +478,9 @@ def get_cached_predictions(hall: str, prediction_type: str) -> Optional[Dict[str
         prediction_type: 'day' or 'week'
 
     Returns:
-        Dict with 'washers' and 'dryers' lists, or None if not found
+        HorizonPredictions with aligned 'washers' and 'dryers' arrays, or None if not found
     """
-    cache = load_cache()
-    if not cache:
-        return None
-
-    hall_data = cache.get('halls', {}).get(hall)
-    if not hall_data:
-        return None
-
-    return hall_data.get(prediction_type)
-
-
+    snapshot = prediction_cache.snapshot()
+    predictions = snapshot.halls.get(hall, {}).get(prediction_type) if snapshot else None
+    metrics.cache_lookups.inc(horizon=prediction_type, result='miss' if predictions is None else 'hit')
+    return predictions
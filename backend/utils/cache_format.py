@@ -0,0 +1,121 @@
+"""Binary columnar prediction cache file format
+
+Layout (little-endian):
+
+    magic       4 bytes   b'FARC'
+    version     uint16
+    reserved    uint16
+    header_len  uint32
+    header      UTF-8 JSON, space-padded so the data starts 8-byte aligned
+    data        packed uint16 arrays, one per (hall, horizon, target)
+
+The header records the generation stamp, the step, the start and length of
+each horizon, and the byte offset (from the start of the data section) and
+length of every array. Timestamps are derived from the horizon start and
+the array index, so no per-point strings are stored. Files are written to
+a temporary path and renamed into place; readers memory-map them and get
+zero-copy NumPy views.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+MAGIC = b'FARC'
+FORMAT_VERSION = 1
+VALUE_DTYPE = np.dtype('<u2')
+
+_PREAMBLE = struct.Struct('<4sHHI')
+_ALIGNMENT = 8
+
+ArrayKey = Tuple[str, str, str]  # (hall, horizon, target)
+
+
+class CacheFormatError(ValueError):
+    """Raised when a cache file is not in the expected format"""
+
+
+def write_cache_file(path: Path, header: Dict, arrays: Iterable[Tuple[ArrayKey, np.ndarray]]):
+    """Atomically write a cache file
+
+    Args:
+        path: destination; replaced via rename once fully written
+        header: JSON-compatible metadata stored alongside the arrays
+        arrays: ((hall, horizon, target), values) pairs
+    """
+    entries = []
+    chunks = []
+    offset = 0
+    for (hall, horizon, target), values in arrays:
+        packed = np.clip(values, 0, np.iinfo(VALUE_DTYPE).max).astype(VALUE_DTYPE).tobytes()
+        entries.append({
+            'hall': hall, 'horizon': horizon, 'target': target,
+            'offset': offset, 'length': len(values),
+        })
+        chunks.append(packed)
+        offset += len(packed)
+
+    header_bytes = json.dumps(dict(header, arrays=entries), separators=(',', ':')).encode('utf-8')
+    padding = -(_PREAMBLE.size + len(header_bytes)) % _ALIGNMENT
+    header_bytes += b' ' * padding
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.stem}-', suffix='.tmp')
+    try:
+        # mkstemp creates files as 0600; cache files are shared with other workers
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+            f.write(header_bytes)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def read_cache_header(buffer) -> Tuple[Dict, int]:
+    """Parse the header of a mapped cache file
+
+    Returns:
+        (header dict, byte offset of the data section)
+    """
+    if len(buffer) < _PREAMBLE.size:
+        raise CacheFormatError('Cache file is truncated')
+
+    magic, version, _, header_len = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise CacheFormatError('Not a prediction cache file')
+    if version != FORMAT_VERSION:
+        raise CacheFormatError(f'Unsupported cache format version {version}')
+
+    data_start = _PREAMBLE.size + header_len
+    if len(buffer) < data_start:
+        raise CacheFormatError('Cache file is truncated')
+
+    header = json.loads(bytes(buffer[_PREAMBLE.size:data_start]))
+    return header, data_start
+
+
+def map_cache_file(path: Path) -> mmap.mmap:
+    """Memory-map a cache file read-only"""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def array_views(buffer, header: Dict, data_start: int) -> Dict[ArrayKey, np.ndarray]:
+    """Zero-copy views of every array described by ``header``"""
+    views = {}
+    for entry in header.get('arrays', []):
+        start = data_start + entry['offset']
+        if start + entry['length'] * VALUE_DTYPE.itemsize > len(buffer):
+            raise CacheFormatError('Cache file is truncated')
+        views[(entry['hall'], entry['horizon'], entry['target'])] = np.frombuffer(
+            buffer, dtype=VALUE_DTYPE, count=entry['length'], offset=start
+        )
+    return views
@@ -0,0 +1,200 @@
+"""Persistent store of per-date prediction arrays
+
+Predictions for a (hall, target, date) depend only on calendar features
+and the model, so once computed they can be reused until the model
+changes. Arrays are kept on disk under cache/forecasts, keyed by model
+version, and fronted by a bounded in-memory LRU. Entries expire TTL
+seconds after they were written, in memory and on disk, and the disk
+directory is pruned periodically so it cannot grow without bound (on
+Cloud Run it lives in memory).
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from . import metrics
+from .horizon import SLOTS_PER_DAY
+
+FORECAST_STORE_DIR = Path(os.environ.get(
+    'FORECAST_STORE_DIR', Path(__file__).parent.parent / 'cache' / 'forecasts'
+))
+
+# In-memory LRU bound (number of day arrays), and seconds an entry stays
+# fresh after it was written
+FORECAST_STORE_MAX_ENTRIES = int(os.environ.get('FORECAST_STORE_MAX_ENTRIES', '4096'))
+FORECAST_STORE_TTL = float(os.environ.get('FORECAST_STORE_TTL', '21600'))
+
+# On-disk bound (number of day files across all model versions), and the
+# minimum seconds between prunes of expired and excess files
+FORECAST_STORE_MAX_FILES = int(os.environ.get('FORECAST_STORE_MAX_FILES', '5000'))
+FORECAST_STORE_PRUNE_INTERVAL = float(os.environ.get('FORECAST_STORE_PRUNE_INTERVAL', '600'))
+
+# Values are small non-negative machine counts
+STORE_DTYPE = np.dtype('<u2')
+
+StoreKey = Tuple[str, str, str, date]
+
+
+class ForecastStore:
+    """Disk-backed store of day prediction arrays with an in-memory LRU"""
+
+    def __init__(self, root: Path = FORECAST_STORE_DIR,
+                 max_entries: int = FORECAST_STORE_MAX_ENTRIES,
+                 ttl: float = FORECAST_STORE_TTL,
+                 max_files: int = FORECAST_STORE_MAX_FILES,
+                 prune_interval: float = FORECAST_STORE_PRUNE_INTERVAL):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_files = max_files
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        # key -> (wall-clock expiry, values)
+        self._entries: 'OrderedDict[StoreKey, Tuple[float, np.ndarray]]' = OrderedDict()
+        self._next_prune = 0.0
+
+    def _path(self, key: StoreKey) -> Path:
+        hall, target_type, version, day = key
+        safe_version = re.sub(r'[^A-Za-z0-9._-]', '_', version)
+        return self.root / safe_version / str(hall) / target_type / f'{day.isoformat()}.u16'
+
+    def _remember(self, key: StoreKey, values: np.ndarray, written_at: float):
+        with self._lock:
+            self._entries[key] = (written_at + self.ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_memory(self, key: StoreKey) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return values
+
+    def _read_disk(self, key: StoreKey) -> Tuple[Optional[np.ndarray], float]:
+        """(values, write time) of a fresh disk entry, or (None, 0) if missing or expired"""
+        path = self._path(key)
+        try:
+            written_at = path.stat().st_mtime
+            if written_at + self.ttl < time.time():
+                return None, 0.0
+            values = np.fromfile(path, dtype=STORE_DTYPE)
+        except (OSError, ValueError):
+            return None, 0.0
+        if len(values) != SLOTS_PER_DAY:
+            return None, 0.0
+        return _freeze(values.astype(np.int64)), written_at
+
+    def _write_disk(self, key: StoreKey, values: np.ndarray):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial array
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            os.fchmod(fd, 0o644)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(np.clip(values, 0, np.iinfo(STORE_DTYPE).max).astype(STORE_DTYPE).tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f'[Store] Error writing {path}: {e}')
+
+    def get_many(self, hall, target_type, version, dates: Iterable[date]) -> Dict[date, np.ndarray]:
+        """Return stored arrays for whichever of ``dates`` are available"""
+        found = {}
+        for day in dates:
+            key = (str(hall), target_type, version, day)
+            values = self._get_memory(key)
+            result = 'memory'
+            if values is None:
+                values, written_at = self._read_disk(key)
+                result = 'disk' if values is not None else 'miss'
+                if values is not None:
+                    self._remember(key, values, written_at)
+            metrics.store_lookups.inc(result=result)
+            if values is not None:
+                found[day] = values
+        return found
+
+    def put_many(self, hall, target_type, version, values_by_date: Dict[date, np.ndarray]):
+        """Store day arrays in memory and on disk"""
+        written_at = time.time()
+        for day, values in values_by_date.items():
+            key = (str(hall), target_type, version, day)
+            self._remember(key, _freeze(values), written_at)
+            self._write_disk(key, values)
+        self._maybe_prune()
+
+    def _maybe_prune(self):
+        with self._lock:
+            if time.monotonic() < self._next_prune:
+                return
+            self._next_prune = time.monotonic() + self.prune_interval
+        self.prune()
+
+    def prune(self) -> int:
+        """Delete expired disk entries, then the oldest beyond max_files
+
+        Also removes leftover temp files and directories emptied by the
+        prune, such as those of retired model versions. Returns the number
+        of files deleted.
+        """
+        files = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    files.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    pass
+
+        files.sort()
+        expired_before = time.time() - self.ttl
+        excess = len(files) - self.max_files
+        removed = 0
+        for index, (mtime, path) in enumerate(files):
+            if mtime >= expired_before and index >= excess:
+                break
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+
+        for dirpath, _, _ in sorted(os.walk(self.root), reverse=True):
+            if dirpath != str(self.root):
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass
+
+        if removed:
+            print(f'[Store] Pruned {removed} of {len(files)} stored days')
+        return removed
+
+    def clear_memory(self):
+        """Drop every in-memory entry (disk entries are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+
+def _freeze(values: np.ndarray) -> np.ndarray:
+    """Make a shared array read-only so callers cannot corrupt the store"""
+    values.setflags(write=False)
+    return values
+
+
+forecast_store = ForecastStore()
@@ -0,0 +1,127 @@
+"""Prediction horizons and feature-matrix construction
+
+A horizon is a regular grid of naive America/Chicago wall-clock times.
+Its feature matrix is built with vectorized NumPy date arithmetic, and
+ISO timestamps are only produced when a caller iterates over them.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+CENTRAL_TZ = ZoneInfo('America/Chicago')
+
+# Predictions are made on a fixed 5-minute grid
+STEP_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // STEP_MINUTES
+
+# Column order expected by the models
+FEATURE_COLUMNS = ('hall', 'month', 'weekday', 'hour', 'minute', 'year', 'day')
+
+
+def central_now() -> datetime:
+    """Current time in Central Time"""
+    return datetime.now(CENTRAL_TZ)
+
+
+def central_today() -> date:
+    """Today's date in Central Time"""
+    return central_now().date()
+
+
+class Horizon:
+    """Evenly spaced prediction times starting at ``start``"""
+
+    def __init__(self, start: datetime, periods: int, step_minutes: int = STEP_MINUTES):
+        self.start = start.replace(tzinfo=None, second=0, microsecond=0)
+        self.periods = max(0, int(periods))
+        self.step_minutes = step_minutes
+
+    @classmethod
+    def between(cls, start: datetime, end: datetime, step_minutes: int = STEP_MINUTES) -> 'Horizon':
+        """Horizon from ``start`` up to and including ``end``"""
+        span = int((end - start).total_seconds() // 60)
+        periods = span // step_minutes + 1 if span >= 0 else 0
+        return cls(start, periods, step_minutes)
+
+    @classmethod
+    def for_days(cls, first_day: date, last_day: date, step_minutes: int = STEP_MINUTES) -> 'Horizon':
+        """Horizon covering whole days from ``first_day`` to ``last_day`` inclusive"""
+        days = (last_day - first_day).days + 1
+        start = datetime(first_day.year, first_day.month, first_day.day)
+        return cls(start, max(0, days) * (24 * 60 // step_minutes), step_minutes)
+
+    @classmethod
+    def for_day(cls, day: date, step_minutes: int = STEP_MINUTES) -> 'Horizon':
+        """Horizon covering one day (00:00 to 23:55)"""
+        return cls.for_days(day, day, step_minutes)
+
+    @classmethod
+    def for_week(cls, day: date, step_minutes: int = STEP_MINUTES) -> 'Horizon':
+        """Horizon covering the Monday-Sunday week containing ``day``"""
+        monday = day - timedelta(days=day.weekday())
+        return cls.for_days(monday, monday + timedelta(days=6), step_minutes)
+
+    def __len__(self) -> int:
+        return self.periods
+
+    @property
+    def end(self) -> datetime:
+        """Last time in the horizon"""
+        return self.start + timedelta(minutes=self.step_minutes * (self.periods - 1))
+
+    def index_of(self, dt: datetime) -> Optional[int]:
+        """Position of the slot containing wall-clock time ``dt``, or None if outside"""
+        minutes = (dt.replace(tzinfo=None) - self.start).total_seconds() // 60
+        index = int(minutes // self.step_minutes)
+        return index if 0 <= index < self.periods else None
+
+    def times(self) -> np.ndarray:
+        """Prediction times as a datetime64[m] array"""
+        start = np.datetime64(self.start, 'm')
+        return start + np.arange(self.periods, dtype=np.int64) * self.step_minutes
+
+    def features(self, hall) -> np.ndarray:
+        """Contiguous (periods, 7) int64 feature matrix in FEATURE_COLUMNS order"""
+        times = self.times()
+        days = times.astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        minute_of_day = (times - days).astype(np.int64)
+
+        matrix = np.empty((self.periods, len(FEATURE_COLUMNS)), dtype=np.int64)
+        matrix[:, 0] = int(hall)
+        matrix[:, 1] = months.astype(np.int64) % 12 + 1
+        # 1970-01-01 was a Thursday (weekday 3 with Monday = 0)
+        matrix[:, 2] = (days.astype(np.int64) + 3) % 7
+        matrix[:, 3] = minute_of_day // 60
+        matrix[:, 4] = minute_of_day % 60
+        matrix[:, 5] = days.astype('datetime64[Y]').astype(np.int64) + 1970
+        matrix[:, 6] = (days - months).astype(np.int64) + 1
+        return matrix
+
+    def start_timestamp(self) -> str:
+        """Central Time ISO timestamp of the first prediction time"""
+        return self.start.replace(tzinfo=CENTRAL_TZ).isoformat()
+
+    def iter_timestamps(self) -> Iterator[str]:
+        """Lazily yield Central Time ISO timestamps for each prediction time"""
+        step = timedelta(minutes=self.step_minutes)
+        current = self.start
+        for _ in range(self.periods):
+            yield current.replace(tzinfo=CENTRAL_TZ).isoformat()
+            current += step
+
+
+def postprocess(predicted_values) -> np.ndarray:
+    """Round raw model output to non-negative integer machine counts"""
+    values = np.asarray(predicted_values, dtype=np.float64)
+    return np.clip(np.rint(values), 0, None).astype(np.int64)
+
+
+def format_predictions(horizon: Horizon, values: np.ndarray) -> List[Dict]:
+    """Pair post-processed values with the horizon's ISO timestamps"""
+    return [
+        {'timestamp': timestamp, 'value': value}
+        for timestamp, value in zip(horizon.iter_timestamps(), values.tolist())
+    ]
@@ -0,0 +1,200 @@
+"""In-process metrics exposed in the Prometheus text format
+
+Counters and histograms are plain Python objects guarded by a lock each,
+cheap enough to update on every request. Values are per process: with
+several gunicorn workers each one reports its own series, so scrape (or
+aggregate) per worker.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets (seconds) covering cache hits through slow model round-trips
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Buckets for the number of feature rows sent per prediction request
+ROW_BUCKETS = (1, 288, 576, 1152, 2016, 4032, 5000, 10000, 26784)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named family of series keyed by label values"""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block, in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        names = self.labelnames + ('le',)
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labelnames, key)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class Registry:
+    """Collection of metrics rendered together by the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Create and register a Counter"""
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Create and register a Histogram"""
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# HTTP
+http_request_duration = histogram(
+    'far_http_request_duration_seconds', 'Request latency by route',
+    ('route', 'method', 'status'),
+)
+
+# Prediction cache
+cache_lookups = counter(
+    'far_prediction_cache_lookups_total', 'Cached prediction lookups by result', ('horizon', 'result'),
+)
+cache_reloads = counter(
+    'far_prediction_cache_reloads_total', 'Cache file (re)loads into memory by result', ('result',),
+)
+cache_reload_duration = histogram(
+    'far_prediction_cache_reload_seconds', 'Time to map the cache file and wrap its arrays',
+)
+cache_generation_duration = histogram(
+    'far_cache_generation_phase_seconds', 'Cache generation time by phase', ('phase',),
+)
+
+# Forecast store
+store_lookups = counter(
+    'far_forecast_store_lookups_total', 'Forecast store day lookups by result', ('result',),
+)
+
+# Model predictions
+predict_duration = histogram(
+    'far_batch_predict_seconds', 'Prediction request round-trip time',
+    ('backend', 'target'),
+)
+predict_rows = histogram(
+    'far_batch_predict_rows', 'Feature rows sent per prediction request',
+    ('backend', 'target'), buckets=ROW_BUCKETS,
+)
+predict_failures = counter(
+    'far_batch_predict_failures_total', 'Failed prediction requests', ('backend', 'target'),
+)
@@ -0,0 +1,238 @@
+"""Schedule planner scoring
+
+Scores every 5-minute slot of a day from aligned washer/dryer prediction
+arrays in one vectorized step, then picks the best and alternative slots
+with partial selection. Only the slots that are returned get formatted.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .horizon import SLOTS_PER_DAY, STEP_MINUTES
+
+# (washer weight, dryer weight) for each algorithm preference
+PREFERENCE_WEIGHTS = {
+    'washers': (0.7, 0.3),
+    'dryers': (0.3, 0.7),
+    'balanced': (0.5, 0.5),
+}
+
+ALTERNATIVE_COUNT = 3
+
+DAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+# Hour of day for every slot, used to apply time windows
+SLOT_HOURS = np.arange(SLOTS_PER_DAY) * STEP_MINUTES // 60
+
+
+def sunday_weekday(day: date) -> int:
+    """Day of week with Sunday = 0 (the frontend's convention)"""
+    return (day.weekday() + 1) % 7
+
+
+def laundry_days(start_date: date, end_date: date, frequency_days: int,
+                 allowed_days: List[int]) -> List[date]:
+    """Every ``frequency_days``-th day from start to end that falls on an allowed weekday
+
+    ``allowed_days`` uses Sunday = 0, like JavaScript's Date.getDay().
+    """
+    if frequency_days < 1:
+        raise ValueError('frequencyDays must be at least 1')
+
+    days = []
+    current_day = start_date
+    while current_day <= end_date:
+        if sunday_weekday(current_day) in allowed_days:
+            days.append(current_day)
+        current_day += timedelta(days=frequency_days)
+    return days
+
+
+def schedule_days(params: Mapping[str, str]) -> List[date]:
+    """Laundry days requested by schedule query parameters
+
+    Reads startDate, endDate (YYYY-MM-DD), frequencyDays and the optional
+    comma-separated daysOfWeek.
+
+    Raises:
+        ValueError: with a message suitable for a 400 response
+    """
+    start_date_str = params.get('startDate')
+    end_date_str = params.get('endDate')
+    frequency_days_str = params.get('frequencyDays')
+    days_of_week_str = params.get('daysOfWeek')
+
+    if not start_date_str or not end_date_str or not frequency_days_str:
+        raise ValueError('Missing required parameters: startDate, endDate, frequencyDays')
+
+    try:
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format') from None
+
+    try:
+        frequency_days = int(frequency_days_str)
+        allowed_days = [0, 1, 2, 3, 4, 5, 6]
+        if days_of_week_str:
+            allowed_days = [int(d) for d in days_of_week_str.split(',')]
+    except ValueError:
+        raise ValueError('frequencyDays and daysOfWeek must be integers') from None
+
+    if start_date > end_date:
+        raise ValueError('Start date must be before end date')
+
+    return laundry_days(start_date, end_date, frequency_days, allowed_days)
+
+
+def format_time_12h(hour, minute):
+    period = 'PM' if hour >= 12 else 'AM'
+    hour_12 = hour % 12 or 12
+    return f"{hour_12}:{minute:02d} {period}"
+
+
+def slot_key(dt: datetime) -> Tuple[date, int]:
+    """(date, slot of the day) containing a wall-clock time"""
+    return dt.date(), (dt.hour * 60 + dt.minute) // STEP_MINUTES
+
+
+def slot_time(slot: int) -> Tuple[int, int]:
+    """(hour, minute) at the start of a slot"""
+    return divmod(int(slot) * STEP_MINUTES, 60)
+
+
+def score_slots(washers: np.ndarray, dryers: np.ndarray, preference: str,
+                time_window: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """Combined score for every slot; slots outside the window are -inf
+
+    Args:
+        washers, dryers: aligned per-slot availability for one day
+        preference: 'washers', 'dryers' or 'balanced'
+        time_window: inclusive (start_hour, end_hour), or None for all day
+    """
+    washer_weight, dryer_weight = PREFERENCE_WEIGHTS.get(preference, PREFERENCE_WEIGHTS['balanced'])
+    scores = washers * washer_weight + dryers * dryer_weight
+
+    if time_window is not None:
+        start_hour, end_hour = time_window
+        hours = SLOT_HOURS[:len(scores)]
+        scores = np.where((hours >= start_hour) & (hours <= end_hour), scores, -np.inf)
+
+    return scores
+
+
+def rank_slots(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """Indices of the ``k`` best finite scores, best first
+
+    Ties go to the earlier slot. When ``k`` is given only the top ``k``
+    are found (partial selection) rather than sorting every slot.
+    """
+    candidates = np.flatnonzero(np.isfinite(scores))
+
+    if k is not None and len(candidates) > k:
+        candidate_scores = scores[candidates]
+        kth = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+        above = candidates[candidate_scores > kth]
+        ties = candidates[candidate_scores == kth][:k - len(above)]
+        candidates = np.concatenate([above, ties])
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+def _round_score(value) -> float:
+    return round(float(value) * 10) / 10
+
+
+def plan_day(target_date: date, washers: np.ndarray, dryers: np.ndarray, preference: str,
+             time_window: Optional[Tuple[int, int]] = None, include_all_times: bool = False,
+             all_times_offset: int = 0, all_times_limit: Optional[int] = None) -> Dict:
+    """Pick the best laundry time for one day
+
+    Args:
+        target_date: the day being planned
+        washers, dryers: aligned per-slot availability for the day
+        preference: algorithm preference, see PREFERENCE_WEIGHTS
+        time_window: inclusive (start_hour, end_hour) or None
+        include_all_times: also return every candidate slot, best first
+        all_times_offset, all_times_limit: page of the full list to return
+    """
+    scores = score_slots(washers, dryers, preference, time_window)
+    return day_result(target_date, washers, dryers, scores,
+                      include_all_times=include_all_times,
+                      all_times_offset=all_times_offset,
+                      all_times_limit=all_times_limit)
+
+
+def day_result(target_date: date, washers: np.ndarray, dryers: np.ndarray, scores: np.ndarray,
+               best_slot: Optional[int] = None, include_all_times: bool = False,
+               all_times_offset: int = 0, all_times_limit: Optional[int] = None) -> Dict:
+    """Format one day's schedule entry from its slot scores
+
+    The best slot is the top-scoring one unless ``best_slot`` is given (as
+    chosen by a multi-day solver); alternatives are the next best slots.
+    """
+    day_of_week = DAY_NAMES[sunday_weekday(target_date)]
+
+    if include_all_times:
+        ranked = rank_slots(scores)
+        top = ranked[:1 + ALTERNATIVE_COUNT]
+    else:
+        ranked = None
+        top = rank_slots(scores, 1 + ALTERNATIVE_COUNT)
+
+    if best_slot is None and len(top) > 0:
+        best_slot = int(top[0])
+
+    if best_slot is None:
+        return {
+            'date': target_date.strftime('%Y-%m-%d'),
+            'dayOfWeek': day_of_week,
+            'bestTime': None,
+            'bestTimeFormatted': 'No availability',
+            'washersAvailable': 0,
+            'dryersAvailable': 0,
+            'combinedScore': 0,
+            'alternativeTimes': []
+        }
+
+    best_hour, best_minute = slot_time(best_slot)
+
+    # Get alternative times (top 3 after best)
+    alternatives = [slot for slot in top if slot != best_slot][:ALTERNATIVE_COUNT]
+    alternative_times = [format_time_12h(*slot_time(slot)) for slot in alternatives]
+
+    result = {
+        'date': target_date.strftime('%Y-%m-%d'),
+        'dayOfWeek': day_of_week,
+        'bestTime': f"{best_hour:02d}:{best_minute:02d}",
+        'bestTimeFormatted': format_time_12h(best_hour, best_minute),
+        'washersAvailable': round(int(washers[best_slot])),
+        'dryersAvailable': round(int(dryers[best_slot])),
+        'combinedScore': _round_score(scores[best_slot]),
+        'alternativeTimes': alternative_times
+    }
+
+    # Sorted times for swapping functionality, only when asked for
+    if include_all_times:
+        end = None if all_times_limit is None else all_times_offset + all_times_limit
+        result['allSortedTimes'] = [
+            format_slot(slot, washers, dryers, scores)
+            for slot in ranked[all_times_offset:end]
+        ]
+        result['allSortedTimesTotal'] = len(ranked)
+
+    return result
+
+
+def format_slot(slot, washers: np.ndarray, dryers: np.ndarray, scores: np.ndarray) -> Dict:
+    """One entry of allSortedTimes"""
+    hour, minute = slot_time(slot)
+    return {
+        'time': f"{hour:02d}:{minute:02d}",
+        'formatted': format_time_12h(hour, minute),
+        'washers': round(int(washers[slot])),
+        'dryers': round(int(dryers[slot])),
+        'score': _round_score(scores[slot])
+    }
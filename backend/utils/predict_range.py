@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+import numpy as np
+
+from .backends import abatch_predict, batch_predict, get_model_version
+from .forecast_store import forecast_store
+from .horizon import Horizon, postprocess
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+# Longest date range served by a single request
+MAX_RANGE_DAYS = int(os.environ.get('FORECAST_RANGE_MAX_DAYS', '92'))
+
+# Days in the first batch when results are streamed back one day at a time
+STREAM_CHUNK_DAYS = int(os.environ.get('STREAM_CHUNK_DAYS', '7'))
+
+# Concurrent requests for the same (hall, target, version, date) share one prediction
+_inflight = SingleFlight()
+_ainflight = AsyncSingleFlight()
+
+
+def range_days(params: Mapping[str, str]) -> List[date]:
+    """Every day from the start to the end query parameter (YYYY-MM-DD, inclusive)
+
+    Raises:
+        ValueError: with a message suitable for a 400 response
+    """
+    start_str = params.get('start')
+    end_str = params.get('end')
+
+    if not start_str or not end_str:
+        raise ValueError('Missing required parameters: start, end')
+
+    try:
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format') from None
+
+    if start_date > end_date:
+        raise ValueError('Start date must be before end date')
+
+    day_count = (end_date - start_date).days + 1
+    if day_count > MAX_RANGE_DAYS:
+        raise ValueError(f'Date range cannot exceed {MAX_RANGE_DAYS} days')
+
+    return [start_date + timedelta(days=i) for i in range(day_count)]
+
+
+def predict_dates(hall, target_type, dates: Iterable[date]) -> Dict[date, np.ndarray]:
+    """Predict full days for an arbitrary set of dates in one batch
+
+    Dates already in the forecast store are served from it; feature rows
+    for the remaining dates are stacked into a single matrix, so the number
+    of backend calls does not grow with the number of dates. Dates another
+    thread is already predicting are waited on rather than re-requested.
+
+    Returns:
+        dict of date -> read-only int64 array aligned with Horizon.for_day(date)
+    """
+    unique_dates = sorted(set(dates))
+    if not unique_dates:
+        return {}
+
+    hall = str(hall)
+    version = get_model_version(target_type)
+    results = forecast_store.get_many(hall, target_type, version, unique_dates)
+    missing_dates = [day for day in unique_dates if day not in results]
+
+    if missing_dates:
+        def compute(keys):
+            days = [key[3] for key in keys]
+
+            # Another thread may have stored some of these since our lookup
+            predicted = forecast_store.get_many(hall, target_type, version, days)
+            to_predict = [day for day in days if day not in predicted]
+
+            if to_predict:
+                features = np.concatenate([Horizon.for_day(day).features(hall) for day in to_predict])
+
+                # Call prediction backend
+                values = postprocess(batch_predict(target_type, features))
+
+                fresh = dict(zip(to_predict, np.split(values, len(to_predict))))
+                forecast_store.put_many(hall, target_type, version, fresh)
+                predicted.update(fresh)
+
+            return {(hall, target_type, version, day): predicted[day] for day in days}
+
+        keys = [(hall, target_type, version, day) for day in missing_dates]
+        for key, values in _inflight.do_many(keys, compute).items():
+            results[key[3]] = values
+
+    return results
+
+
+async def apredict_dates(hall, target_type, dates: Iterable[date]) -> Dict[date, np.ndarray]:
+    """Async predict_dates for the ASGI server
+
+    Store misses are predicted with one awaited backend batch, so waiting
+    on the model holds no thread. Results land in the forecast store,
+    where the synchronous request handlers then find them. The version
+    lookup and store reads and writes may block, so they run in a worker
+    thread, off the event loop.
+    """
+    unique_dates = sorted(set(dates))
+    if not unique_dates:
+        return {}
+
+    hall = str(hall)
+    # Resolving the version may query the backend (Vertex deployed models)
+    version = await asyncio.to_thread(get_model_version, target_type)
+    results = await asyncio.to_thread(forecast_store.get_many, hall, target_type, version, unique_dates)
+    missing_dates = [day for day in unique_dates if day not in results]
+
+    if missing_dates:
+        async def compute(keys):
+            days = [key[3] for key in keys]
+            features = np.concatenate([Horizon.for_day(day).features(hall) for day in days])
+            values = postprocess(await abatch_predict(target_type, features))
+
+            fresh = dict(zip(days, np.split(values, len(days))))
+            await asyncio.to_thread(forecast_store.put_many, hall, target_type, version, fresh)
+            return {(hall, target_type, version, day): fresh[day] for day in days}
+
+        keys = [(hall, target_type, version, day) for day in missing_dates]
+        for key, values in (await _ainflight.do_many(keys, compute)).items():
+            results[key[3]] = values
+
+    return results
+
+
+def iter_predicted_days(hall, dates: List[date],
+                        chunk_days: int = STREAM_CHUNK_DAYS) -> Iterator[Tuple[date, np.ndarray, np.ndarray]]:
+    """Yield (date, washers, dryers) in order, predicting the dates in growing batches
+
+    The first batch holds ``chunk_days`` dates and each following batch
+    doubles, so streaming responses can send the first days early while a
+    long range still needs only a logarithmic number of backend calls.
+    """
+    start = 0
+    batch_days = max(1, chunk_days)
+    while start < len(dates):
+        batch = dates[start:start + batch_days]
+        washer_values = predict_dates(hall, 'washers', batch)
+        dryer_values = predict_dates(hall, 'dryers', batch)
+        for day in batch:
+            yield day, washer_values[day], dryer_values[day]
+        start += len(batch)
+        batch_days *= 2
+
+
+def predict_range(hall, target_type, start_date: date, end_date: date) -> np.ndarray:
+    """Predict every 5-minute slot from start_date 00:00 to end_date 23:55
+
+    Days missing from the forecast store go to the backend as one batch
+    (chunked only to respect its payload limit).
+
+    Returns:
+        int64 array aligned with Horizon.for_days(start_date, end_date)
+    """
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+    if not days:
+        return np.empty(0, dtype=np.int64)
+
+    values_by_date = predict_dates(hall, target_type, days)
+
+    return np.concatenate([values_by_date[day] for day in days])
+
+if __name__ == "__main__":
+    hall = sys.argv[1]
+    target_type = sys.argv[2]  # 'washers' or 'dryers'
+    start_date = date.fromisoformat(sys.argv[3])  # 'YYYY-MM-DD'
+    end_date = date.fromisoformat(sys.argv[4])  # 'YYYY-MM-DD'
+
+    values = predict_range(hall, target_type, start_date, end_date)
+
+    print(json.dumps(values.tolist()))
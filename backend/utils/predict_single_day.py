@@ -1,69 +1,70 @@
 import json
 import sys
-from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
-import os
+import time
+from datetime import date
+from functools import lru_cache
 
-from .vertex_predict import vertex_batch_predict
+from .backends import get_model_version
+from .forecast_store import FORECAST_STORE_TTL
+from .horizon import Horizon, format_predictions
+from .predict_range import predict_dates
+from .resolutions import BASE_RESOLUTION, RESOLUTIONS, aggregate_columnar, aggregate_predictions, downsample
+from .responses import PreparedResponse, columnar_series, prepare_json, series_predictions
 
 
 def predict_single_day(hall, target_type, date_str):
-    """Generate predictions for a full day (00:00 to 23:59) via Vertex AI endpoint"""
+    """Generate predictions for a full day (00:00 to 23:59) via the configured prediction backend"""
 
     # Parse the date string (YYYY-MM-DD)
     try:
         date_parts = date_str.split('-')
-        year = int(date_parts[0])
-        month = int(date_parts[1])
-        day = int(date_parts[2])
+        target_date = date(int(date_parts[0]), int(date_parts[1]), int(date_parts[2]))
     except:
         print(f"Error parsing date: {date_str}", file=sys.stderr)
         return []
 
-    # Create start and end times for the day in Central Time
-    central_tz = ZoneInfo('America/Chicago')
-    start_of_day = datetime(year, month, day, 0, 0, 0, tzinfo=central_tz)
-    end_of_day = datetime(year, month, day, 23, 59, 59, tzinfo=central_tz)
+    # Every 5 minutes of the day in Central Time
+    horizon = Horizon.for_day(target_date)
 
-    # Generate prediction timestamps (every 5 minutes)
-    prediction_times = []
-    current = start_of_day
-
-    while current <= end_of_day:
-        prediction_times.append(current)
-        current += timedelta(minutes=5)
-
-    if len(prediction_times) == 0:
-        return []
-
-    # Build feature rows
-    features_list = []
-    for pred_time in prediction_times:
-        pred_time_naive = pred_time.replace(tzinfo=None)
-        features_list.append({
-            'hall': int(hall),
-            'month': pred_time_naive.month,
-            'weekday': pred_time_naive.weekday(),
-            'hour': pred_time_naive.hour,
-            'minute': pred_time_naive.minute,
-            'year': pred_time_naive.year,
-            'day': pred_time_naive.day
-        })
-
-    # Call Vertex AI endpoint
-    predicted_values = vertex_batch_predict(target_type, features_list)
+    # Served from the forecast store when this date was predicted before
+    values = predict_dates(hall, target_type, [target_date])[target_date]
 
     # Format results
-    predictions = []
-    for i, pred_time in enumerate(prediction_times):
-        new_value = max(0, int(round(predicted_values[i])))
-
-        predictions.append({
-            'timestamp': pred_time.isoformat(),
-            'value': new_value
-        })
-
-    return predictions
+    return format_predictions(horizon, values)
+
+
+def prepared_single_day(hall, target_date: date, resolution: str = BASE_RESOLUTION,
+                        columnar: bool = False) -> PreparedResponse:
+    """Prepared forecast-date response for both target types
+
+    Serialized bodies are memoized per model version, so repeat requests
+    for a date skip prediction lookup, aggregation, encoding and compression.
+    Like the forecast store entries they are built from, they are rebuilt
+    once per FORECAST_STORE_TTL period.
+    """
+    return _prepare_day(
+        str(hall), target_date, resolution, columnar,
+        get_model_version('washers'), get_model_version('dryers'),
+        int(time.time() // FORECAST_STORE_TTL)
+    )
+
+
+@lru_cache(maxsize=256)
+def _prepare_day(hall, target_date, resolution, columnar, washer_version, dryer_version,
+                 ttl_period) -> PreparedResponse:
+    horizon = Horizon.for_day(target_date)
+    washers = predict_dates(hall, 'washers', [target_date])[target_date]
+    dryers = predict_dates(hall, 'dryers', [target_date])[target_date]
+
+    if resolution == BASE_RESOLUTION:
+        if columnar:
+            return prepare_json(columnar_series(horizon, washers, dryers))
+        return prepare_json({'predictions': series_predictions(horizon, washers, dryers)})
+
+    horizon, columns = downsample(horizon, washers, dryers, RESOLUTIONS[resolution])
+    if columnar:
+        return prepare_json(aggregate_columnar(horizon, columns))
+    return prepare_json({'predictions': aggregate_predictions(horizon, columns)})
 
 if __name__ == "__main__":
     # Read input from command line
@@ -0,0 +1,81 @@
+"""Downsampled forecast series for long-horizon charts
+
+Each coarser resolution aggregates consecutive 5-minute predictions into
+one point holding the min, mean and max availability. The mean is served
+under the usual ``washers``/``dryers`` keys so charts can switch
+resolution without changing how they read a point.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .horizon import Horizon
+
+BASE_RESOLUTION = '5m'
+
+# Aggregated levels and their step in minutes
+RESOLUTIONS = {
+    '15m': 15,
+    '1h': 60,
+    '1d': 24 * 60,
+}
+
+Columns = Dict[str, np.ndarray]
+
+
+def is_valid_resolution(resolution: str) -> bool:
+    return resolution == BASE_RESOLUTION or resolution in RESOLUTIONS
+
+
+def downsample(horizon: Horizon, washers: np.ndarray, dryers: np.ndarray,
+               step_minutes: int) -> Tuple[Horizon, Columns]:
+    """Aggregate aligned washer/dryer arrays to ``step_minutes`` per point
+
+    Returns the coarser horizon and its min/mean/max columns. A trailing
+    partial group (a horizon that is not a whole number of steps long) is
+    aggregated over the slots it has.
+    """
+    factor = step_minutes // horizon.step_minutes
+    starts = np.arange(0, len(horizon), factor)
+    counts = np.diff(np.append(starts, len(horizon)))
+
+    columns = {}
+    for name, values in (('washers', washers), ('dryers', dryers)):
+        values = np.asarray(values, dtype=np.int64)
+        if len(values) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            columns.update({name: empty, f'{name}Min': empty, f'{name}Max': empty})
+            continue
+        columns[name] = np.round(np.add.reduceat(values, starts) / counts, 1)
+        columns[f'{name}Min'] = np.minimum.reduceat(values, starts)
+        columns[f'{name}Max'] = np.maximum.reduceat(values, starts)
+
+    return Horizon(horizon.start, len(starts), step_minutes), columns
+
+
+def aggregate_predictions(horizon: Horizon, columns: Columns) -> List[Dict]:
+    """One dict per aggregated point, like series_predictions with min/max added"""
+    names = sorted(columns)
+    rows = zip(horizon.iter_timestamps(), *(columns[name].tolist() for name in names))
+    return [
+        {'timestamp': timestamp, **dict(zip(names, values))}
+        for timestamp, *values in rows
+    ]
+
+
+def aggregate_columnar(horizon: Horizon, columns: Columns) -> Dict:
+    """Columnar form of aggregate_predictions"""
+    return {
+        'start': horizon.start_timestamp(),
+        'stepMinutes': horizon.step_minutes,
+        **{name: values.tolist() for name, values in columns.items()},
+    }
+
+
+def downsample_to(horizon: Horizon, washers: np.ndarray, dryers: np.ndarray,
+                  resolution: str) -> Optional[Tuple[Horizon, Columns]]:
+    """Aggregate to ``resolution``, or None unless it is a whole multiple of the horizon's step"""
+    step_minutes = RESOLUTIONS.get(resolution)
+    if step_minutes is None or step_minutes <= horizon.step_minutes or step_minutes % horizon.step_minutes:
+        return None
+    return downsample(horizon, washers, dryers, step_minutes)
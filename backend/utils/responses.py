@@ -0,0 +1,155 @@
+"""Shared response builders for forecast endpoints"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List
+
+# Content type of newline-delimited JSON streams
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# gzip level for prepared bodies; higher levels cost several times the CPU
+# for a few percent smaller forecast bodies
+GZIP_LEVEL = 6
+
+
+def merge_predictions(washers: List[Dict], dryers: List[Dict]) -> List[Dict]:
+    """Merge washer and dryer series into one chronologically sorted list"""
+    pred_map = {}
+    for pred in washers:
+        ts = pred['timestamp']
+        if ts not in pred_map:
+            pred_map[ts] = {'washers': None, 'dryers': None}
+        pred_map[ts]['washers'] = pred['value']
+
+    for pred in dryers:
+        ts = pred['timestamp']
+        if ts not in pred_map:
+            pred_map[ts] = {'washers': None, 'dryers': None}
+        pred_map[ts]['dryers'] = pred['value']
+
+    predictions = []
+    for ts, values in pred_map.items():
+        predictions.append({
+            'timestamp': ts,
+            'washers': values['washers'] or 0,
+            'dryers': values['dryers'] or 0,
+        })
+
+    predictions.sort(key=lambda x: datetime.fromisoformat(x['timestamp']))
+    return predictions
+
+
+def forecast_stats(predictions: List[Dict]) -> Dict:
+    """Calculate min/max/avg availability over a merged prediction list"""
+    all_washers = [p['washers'] for p in predictions if p['washers'] is not None]
+    all_dryers = [p['dryers'] for p in predictions if p['dryers'] is not None]
+
+    return {
+        'avgWashers': sum(all_washers) / len(all_washers) if all_washers else 0,
+        'avgDryers': sum(all_dryers) / len(all_dryers) if all_dryers else 0,
+        'maxWashers': max(all_washers) if all_washers else 0,
+        'maxDryers': max(all_dryers) if all_dryers else 0,
+        'minWashers': min(all_washers) if all_washers else 0,
+        'minDryers': min(all_dryers) if all_dryers else 0
+    }
+
+
+def array_stats(washers, dryers) -> Dict:
+    """forecast_stats for aligned washer/dryer arrays"""
+    count = len(washers)
+    return {
+        'avgWashers': int(washers.sum()) / count if count else 0,
+        'avgDryers': int(dryers.sum()) / len(dryers) if len(dryers) else 0,
+        'maxWashers': int(washers.max()) if count else 0,
+        'maxDryers': int(dryers.max()) if len(dryers) else 0,
+        'minWashers': int(washers.min()) if count else 0,
+        'minDryers': int(dryers.min()) if len(dryers) else 0
+    }
+
+
+class StatsAccumulator:
+    """array_stats computed incrementally over a stream of aligned arrays"""
+
+    def __init__(self):
+        self.count = 0
+        self.totals = {'washers': 0, 'dryers': 0}
+        self.minimums = {}
+        self.maximums = {}
+
+    def add(self, washers, dryers):
+        if len(washers) == 0:
+            return
+        self.count += len(washers)
+        for name, values in (('washers', washers), ('dryers', dryers)):
+            low, high = int(values.min()), int(values.max())
+            self.totals[name] += int(values.sum())
+            self.minimums[name] = min(self.minimums.get(name, low), low)
+            self.maximums[name] = max(self.maximums.get(name, high), high)
+
+    def stats(self) -> Dict:
+        if not self.count:
+            return forecast_stats([])
+        return {
+            'avgWashers': self.totals['washers'] / self.count,
+            'avgDryers': self.totals['dryers'] / self.count,
+            'maxWashers': self.maximums['washers'],
+            'maxDryers': self.maximums['dryers'],
+            'minWashers': self.minimums['washers'],
+            'minDryers': self.minimums['dryers']
+        }
+
+
+def ndjson_record(record_type: str, data) -> bytes:
+    """One line of an NDJSON stream: {"type": ..., "data": ...}"""
+    return json.dumps({'type': record_type, 'data': data}, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+@dataclass(frozen=True)
+class PreparedResponse:
+    """A JSON response body serialized ahead of time
+
+    ``etag`` identifies the identity-encoded body; the gzip-encoded body is a
+    different representation and gets its own strong ETag.
+    """
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+    @property
+    def gzip_etag(self) -> str:
+        return f'{self.etag}-gzip'
+
+
+def prepare_json(data) -> PreparedResponse:
+    """Serialize, compress and fingerprint a JSON-compatible object"""
+    body = json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return PreparedResponse(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+        etag=hashlib.sha256(body).hexdigest()[:32],
+    )
+
+
+def columnar_series(horizon, washers, dryers) -> Dict:
+    """Compact form of series_predictions: a start time, step and value columns
+
+    Slot i is ``stepMinutes * i`` wall-clock minutes after ``start``.
+    """
+    return {
+        'start': horizon.start_timestamp(),
+        'stepMinutes': horizon.step_minutes,
+        'washers': washers.tolist(),
+        'dryers': dryers.tolist(),
+    }
+
+
+def series_predictions(horizon, washers, dryers) -> List[Dict]:
+    """Build the merged prediction list for aligned washer/dryer arrays"""
+    return [
+        {'timestamp': timestamp, 'washers': washer_value, 'dryers': dryer_value}
+        for timestamp, washer_value, dryer_value in zip(
+            horizon.iter_timestamps(), washers.tolist(), dryers.tolist()
+        )
+    ]
@@ -0,0 +1,113 @@
+"""In-process scheduled cache refresh
+
+Shortly before America/Chicago midnight the scheduler builds the next
+day's cache off to the side (including the new week horizon when the next
+day is a Monday). At midnight it atomically swaps the new cache in. Request
+threads never regenerate the cache or see a half-written file.
+
+With several worker processes, only the one holding the cache generation
+lock builds and writes the cache; the others pick up the new file when
+its mtime changes.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .cache import (
+    CacheGenerationLock,
+    CacheSnapshot,
+    build_cache_snapshot,
+    generate_and_save_cache,
+    is_cache_valid,
+    is_cache_warming,
+    save_and_install_snapshot,
+)
+from .horizon import CENTRAL_TZ, central_now
+
+# How long before midnight the next day's cache starts building
+CACHE_REFRESH_LEAD_MINUTES = float(os.environ.get('CACHE_REFRESH_LEAD_MINUTES', '10'))
+
+# Longest single sleep, so a suspended or throttled instance catches up quickly
+CACHE_REFRESH_POLL_SECONDS = float(os.environ.get('CACHE_REFRESH_POLL_SECONDS', '300'))
+
+# Seconds to wait before retrying a failed build
+CACHE_REFRESH_RETRY_SECONDS = float(os.environ.get('CACHE_REFRESH_RETRY_SECONDS', '60'))
+
+
+def next_central_midnight(now: datetime) -> datetime:
+    """The next 00:00 America/Chicago after ``now``"""
+    tomorrow = now.date() + timedelta(days=1)
+    return datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=CENTRAL_TZ)
+
+
+class CacheRefreshScheduler:
+    """Background thread that keeps the prediction cache on the current day"""
+
+    def __init__(self, lead_minutes: float = CACHE_REFRESH_LEAD_MINUTES,
+                 poll_seconds: float = CACHE_REFRESH_POLL_SECONDS):
+        self.lead = timedelta(minutes=lead_minutes)
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Optional[CacheSnapshot] = None
+        self._lock = CacheGenerationLock()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cache-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self._tick()
+            except Exception as e:
+                print(f'[Scheduler] Cache refresh failed: {e}')
+                self._pending = None
+                self._lock.release()
+                delay = CACHE_REFRESH_RETRY_SECONDS
+            self._stop.wait(max(1.0, min(delay, self.poll_seconds)))
+
+    def _tick(self) -> float:
+        """Do whatever is due now and return seconds until the next event"""
+        now = central_now()
+        midnight = next_central_midnight(now)
+        build_at = midnight - self.lead
+
+        # Swap in a prepared cache once its day has started
+        if self._pending is not None and self._pending.generated_date <= now.date().isoformat():
+            print(f'[Scheduler] Installing cache for {self._pending.generated_date}')
+            save_and_install_snapshot(self._pending)
+            self._pending = None
+            self._lock.release()
+
+        # Catch up if the day rolled over without a prepared cache
+        if self._pending is None and not is_cache_warming() and not is_cache_valid():
+            print('[Scheduler] Cache is out of date, regenerating...')
+            generate_and_save_cache()
+
+        # Build tomorrow's cache ahead of midnight, unless another worker
+        # holds the generation lock and is doing it already
+        if self._pending is None and now >= build_at and self._lock.acquire(blocking=False):
+            self._pending = build_cache_snapshot(midnight.date())
+
+        target = midnight if now >= build_at else build_at
+        return target.timestamp() - time.time()
+
+
+_scheduler: Optional[CacheRefreshScheduler] = None
+
+
+def start_refresh_scheduler() -> CacheRefreshScheduler:
+    """Start the process-wide cache refresh scheduler (idempotent)"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = CacheRefreshScheduler()
+    return _scheduler.start()
@@ -0,0 +1,129 @@
+"""Single-flight coalescing of identical concurrent computations
+
+When several threads ask for the same key at the same time, only the
+first one computes it; the others block until that result (or error)
+is available and share it. AsyncSingleFlight does the same for
+coroutines on one event loop.
+"""
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List
+
+
+class _Call:
+    """An in-flight computation for one key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent computations by key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], object]):
+        """Run ``fn`` for ``key`` unless an identical call is already in flight"""
+        return self.do_many([key], lambda keys: {key: fn()})[key]
+
+    def do_many(self, keys: Iterable[Hashable], fn: Callable[[List[Hashable]], Dict]) -> Dict:
+        """Compute many keys at once, sharing any that are already in flight
+
+        ``fn`` receives only the keys this caller is responsible for and
+        must return a dict with a value for each of them. Keys another
+        thread is already computing are waited on instead.
+        """
+        owned = {}
+        waiting = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                call = self._calls.get(key)
+                if call is None:
+                    call = _Call()
+                    self._calls[key] = call
+                    owned[key] = call
+                else:
+                    waiting[key] = call
+
+        results = {}
+        if owned:
+            try:
+                values = fn(list(owned))
+                for key, call in owned.items():
+                    call.value = values[key]
+                    results[key] = call.value
+            except BaseException as e:
+                for call in owned.values():
+                    call.error = e
+                raise
+            finally:
+                with self._lock:
+                    for key in owned:
+                        del self._calls[key]
+                for call in owned.values():
+                    call.done.set()
+
+        for key, call in waiting.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[key] = call.value
+
+        return results
+
+
+class AsyncSingleFlight:
+    """Deduplicates concurrent coroutine computations by key
+
+    Not thread-safe: every caller must run on the same event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do_many(self, keys: Iterable[Hashable],
+                      fn: Callable[[List[Hashable]], Awaitable[Dict]]) -> Dict:
+        """Async SingleFlight.do_many: ``fn`` is awaited for the keys this caller owns"""
+        loop = asyncio.get_running_loop()
+        owned = {}
+        waiting = {}
+        for key in dict.fromkeys(keys):
+            future = self._calls.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._calls[key] = future
+                owned[key] = future
+            else:
+                waiting[key] = future
+
+        results = {}
+        if owned:
+            try:
+                values = await fn(list(owned))
+                for key, future in owned.items():
+                    future.set_result(values[key])
+                    results[key] = values[key]
+            except BaseException as e:
+                for future in owned.values():
+                    if future.done():
+                        continue
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+                        # Mark retrieved so unwaited failures are not logged twice
+                        future.exception()
+                raise
+            finally:
+                for key in owned:
+                    del self._calls[key]
+
+        for key, future in waiting.items():
+            # Shield so a cancelled waiter does not cancel the shared call
+            results[key] = await asyncio.shield(future)
+
+        return results
@@ -0,0 +1,310 @@
+"""Multi-day schedule solver
+
+Plans a whole date range in one pass over the precomputed availability
+arrays. An Objective turns a day's washer/dryer arrays into per-slot
+scores; PlanConstraints mask out slots (time windows, booked slots) and
+couple consecutive laundry runs (minimum gap, time-of-day consistency).
+Dynamic programming over (day, slot) then picks the run times that
+maximize the number of runs first and the total score second.
+"""
+import math
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .horizon import SLOTS_PER_DAY, STEP_MINUTES
+from .planner import (
+    PREFERENCE_WEIGHTS,
+    SLOT_HOURS,
+    day_result,
+    format_time_12h,
+    rank_slots,
+    slot_time,
+    sunday_weekday,
+)
+
+# Longest supported minimum gap; the DP compares slot-by-slot with every day inside it
+MAX_MIN_GAP_HOURS = 24 * 14
+
+# Longest dryer delay that still leaves a dryer slot on the same day
+MAX_DRYER_DELAY_MINUTES = 24 * 60 - STEP_MINUTES
+
+# Default washer cycle for the washer-to-dryer pipeline objective
+DEFAULT_CYCLE_MINUTES = 45
+
+# Added per scheduled run so the solver never drops a feasible day to gain score
+RUN_BONUS = 1e6
+
+_SLOTS = np.arange(SLOTS_PER_DAY)
+# Signed slot difference (current - previous) for every pair of slots
+_SLOT_DELTA = _SLOTS[:, None] - _SLOTS[None, :]
+
+
+class Objective:
+    """Scores every start slot of a day"""
+    name = 'base'
+
+    def evaluate(self, washers: np.ndarray, dryers: np.ndarray,
+                 blocked: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Score each start slot
+
+        Args:
+            washers, dryers: aligned per-slot availability for one day
+            blocked: boolean mask of slots that cannot be used
+
+        Returns:
+            (scores with -inf for unusable slots, dryer slot for each start
+            slot or None when the dryer runs at the same slot)
+        """
+        raise NotImplementedError
+
+
+class WeightedObjective(Objective):
+    """Weighted washer/dryer availability at the same slot"""
+    name = 'weighted'
+
+    def __init__(self, washer_weight: float, dryer_weight: float):
+        self.washer_weight = washer_weight
+        self.dryer_weight = dryer_weight
+
+    def evaluate(self, washers, dryers, blocked):
+        scores = washers * self.washer_weight + dryers * self.dryer_weight
+        return np.where(blocked, -np.inf, scores), None
+
+
+class DryerDelayObjective(Objective):
+    """Washer at slot t, dryer at the best slot at least ``min_delay_slots`` later"""
+    name = 'dryer-delay'
+
+    def __init__(self, washer_weight: float, dryer_weight: float, min_delay_slots: int):
+        self.washer_weight = washer_weight
+        self.dryer_weight = dryer_weight
+        self.min_delay_slots = min_delay_slots
+
+    def evaluate(self, washers, dryers, blocked):
+        count = len(washers)
+        usable_dryers = np.where(blocked, -np.inf, dryers.astype(np.float64))
+
+        # Suffix maximum of dryer availability, keeping the earliest best slot
+        reversed_dryers = usable_dryers[::-1]
+        running_max = np.maximum.accumulate(reversed_dryers)
+        positions = np.where(reversed_dryers >= running_max, np.arange(count), 0)
+        best_from = (count - 1 - np.maximum.accumulate(positions))[::-1]
+        best_value = running_max[::-1]
+
+        # Best dryer slot starting no earlier than t + delay
+        start = np.arange(count) + self.min_delay_slots
+        in_range = start < count
+        start = np.minimum(start, count - 1)
+        dryer_slots = np.where(in_range, best_from[start], -1)
+        dryer_values = np.where(in_range, best_value[start], -np.inf)
+
+        scores = washers * self.washer_weight + dryer_values * self.dryer_weight
+        return np.where(blocked, -np.inf, scores), dryer_slots
+
+
+class PipelineObjective(Objective):
+    """Washer at slot t followed by a dryer at t + the washer cycle length
+
+    Computed as a shift of the dryer array against the washer array; start
+    slots whose dryer slot would fall past the end of the horizon, or onto
+    a blocked slot, are unusable.
+    """
+    name = 'pipeline'
+
+    def __init__(self, washer_weight: float, dryer_weight: float, cycle_slots: int):
+        self.washer_weight = washer_weight
+        self.dryer_weight = dryer_weight
+        self.cycle_slots = cycle_slots
+
+    def evaluate(self, washers, dryers, blocked):
+        count = len(washers)
+        shift = min(self.cycle_slots, count)
+
+        shifted_dryers = np.full(count, -np.inf)
+        shifted_dryers[:count - shift] = np.where(blocked[shift:], -np.inf, dryers[shift:])
+
+        dryer_slots = np.arange(count) + shift
+        dryer_slots[count - shift:] = -1
+
+        scores = washers * self.washer_weight + shifted_dryers * self.dryer_weight
+        return np.where(blocked, -np.inf, scores), dryer_slots
+
+
+def make_objective(preference: str, dryer_delay_minutes: int = 0,
+                   cycle_minutes: Optional[int] = None) -> Objective:
+    """Objective for an algorithm preference
+
+    ``cycle_minutes`` selects the washer-to-dryer pipeline; otherwise a
+    positive ``dryer_delay_minutes`` lets the dryer start any time at least
+    that long after the washer.
+    """
+    washer_weight, dryer_weight = PREFERENCE_WEIGHTS.get(preference, PREFERENCE_WEIGHTS['balanced'])
+    if cycle_minutes is not None:
+        return PipelineObjective(washer_weight, dryer_weight, math.ceil(cycle_minutes / STEP_MINUTES))
+    if dryer_delay_minutes > 0:
+        delay_slots = math.ceil(dryer_delay_minutes / STEP_MINUTES)
+        return DryerDelayObjective(washer_weight, dryer_weight, delay_slots)
+    return WeightedObjective(washer_weight, dryer_weight)
+
+
+@dataclass
+class PlanConstraints:
+    """Constraints applied by the solver
+
+    Attributes:
+        time_windows: Sunday=0 weekday -> inclusive (start_hour, end_hour)
+        booked_slots: (date, slot) pairs that are already taken
+        min_gap_minutes: minimum time between the starts of consecutive runs
+        consistency_weight: score penalty per hour of start-time change
+            between consecutive runs
+    """
+    time_windows: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    booked_slots: Set[Tuple[date, int]] = field(default_factory=set)
+    min_gap_minutes: int = 0
+    consistency_weight: float = 0.0
+
+    def blocked(self, day: date) -> np.ndarray:
+        """Mask of slots on ``day`` that cannot be used"""
+        blocked = np.zeros(SLOTS_PER_DAY, dtype=bool)
+        window = self.time_windows.get(sunday_weekday(day))
+        if window is not None:
+            start_hour, end_hour = window
+            blocked |= (SLOT_HOURS < start_hour) | (SLOT_HOURS > end_hour)
+        for booked_day, slot in self.booked_slots:
+            if booked_day == day and 0 <= slot < SLOTS_PER_DAY:
+                blocked[slot] = True
+        return blocked
+
+
+def solve(days: List[date], scores: List[np.ndarray], constraints: PlanConstraints) -> List[Optional[int]]:
+    """Choose a start slot (or None) for every day
+
+    dp[d, s] is the best value of a plan whose latest run is on day d at
+    slot s. Earlier days far enough back that every slot satisfies the gap
+    are folded into one per-slot running maximum, so each day only compares
+    slot-by-slot against the few nearby days the gap actually constrains.
+    """
+    day_count = len(days)
+    if day_count == 0:
+        return []
+
+    gap_slots = math.ceil(constraints.min_gap_minutes / STEP_MINUTES)
+    penalty = constraints.consistency_weight * np.abs(_SLOT_DELTA) * STEP_MINUTES / 60
+    offsets = [(day - days[0]).days for day in days]
+
+    dp = np.full((day_count, SLOTS_PER_DAY), -np.inf)
+    back_day = np.full((day_count, SLOTS_PER_DAY), -1, dtype=np.int64)
+    back_slot = np.full((day_count, SLOTS_PER_DAY), -1, dtype=np.int64)
+
+    far_value = np.full(SLOTS_PER_DAY, -np.inf)
+    far_day = np.full(SLOTS_PER_DAY, -1, dtype=np.int64)
+    next_far = 0
+
+    for d in range(day_count):
+        # Fold in days whose every slot is at least the gap before every slot today
+        while next_far < d and (offsets[d] - offsets[next_far]) * SLOTS_PER_DAY - (SLOTS_PER_DAY - 1) >= gap_slots:
+            better = dp[next_far] > far_value
+            far_value = np.where(better, dp[next_far], far_value)
+            far_day = np.where(better, next_far, far_day)
+            next_far += 1
+
+        # Starting a fresh plan today is always allowed
+        best_prev = np.zeros(SLOTS_PER_DAY)
+        best_day = np.full(SLOTS_PER_DAY, -1, dtype=np.int64)
+        best_slot = np.full(SLOTS_PER_DAY, -1, dtype=np.int64)
+
+        sources = [(far_value, far_day, None)]
+        for p in range(next_far, d):
+            distance = (offsets[d] - offsets[p]) * SLOTS_PER_DAY + _SLOT_DELTA
+            sources.append((dp[p], np.full(SLOTS_PER_DAY, p), distance >= gap_slots))
+
+        for prev_value, prev_day, allowed in sources:
+            # Rows are today's slots, columns the previous run's slots
+            values = prev_value[None, :] - penalty
+            if allowed is not None:
+                values = np.where(allowed, values, -np.inf)
+            arg = values.argmax(axis=1)
+            value = values[_SLOTS, arg]
+            better = value > best_prev
+            best_prev = np.where(better, value, best_prev)
+            best_day = np.where(better, prev_day[arg], best_day)
+            best_slot = np.where(better, arg, best_slot)
+
+        dp[d] = scores[d] + RUN_BONUS + best_prev
+        back_day[d] = best_day
+        back_slot[d] = best_slot
+
+    chosen: List[Optional[int]] = [None] * day_count
+    d, s = np.unravel_index(int(dp.argmax()), dp.shape)
+    if not np.isfinite(dp[d, s]):
+        return chosen
+
+    while d >= 0:
+        chosen[d] = int(s)
+        d, s = back_day[d, s], back_slot[d, s]
+
+    return chosen
+
+
+def iter_schedule(days: List[date], washers_by_day: Dict[date, np.ndarray],
+                  dryers_by_day: Dict[date, np.ndarray], objective: Objective,
+                  constraints: PlanConstraints, include_all_times: bool = False,
+                  all_times_offset: int = 0, all_times_limit: Optional[int] = None) -> Iterator[Dict]:
+    """Solve the whole range, then format schedule entries one day at a time"""
+    scores = []
+    dryer_slots = []
+    for day in days:
+        day_scores, day_dryer_slots = objective.evaluate(
+            washers_by_day[day], dryers_by_day[day], constraints.blocked(day)
+        )
+        scores.append(day_scores)
+        dryer_slots.append(day_dryer_slots)
+
+    chosen = solve(days, scores, constraints)
+
+    for day, day_scores, day_dryer_slots, slot in zip(days, scores, dryer_slots, chosen):
+        washers = washers_by_day[day]
+        dryers = dryers_by_day[day]
+
+        if slot is None:
+            entry = day_result(day, washers, dryers, np.full(SLOTS_PER_DAY, -np.inf))
+            if np.isfinite(day_scores).any():
+                entry['bestTimeFormatted'] = 'Skipped (constraints)'
+            yield entry
+            continue
+
+        entry = day_result(day, washers, dryers, day_scores, best_slot=slot,
+                           include_all_times=include_all_times,
+                           all_times_offset=all_times_offset,
+                           all_times_limit=all_times_limit)
+
+        if day_dryer_slots is not None:
+            add_dryer_time(entry, dryers, int(day_dryer_slots[slot]))
+
+        yield entry
+
+
+def add_dryer_time(entry: Dict, dryers: np.ndarray, dryer_slot: int):
+    """Report the dryer slot of a run whose dryer starts after its washer"""
+    dryer_hour, dryer_minute = slot_time(dryer_slot)
+    entry['dryersAvailable'] = round(int(dryers[dryer_slot]))
+    entry['dryerTime'] = f"{dryer_hour:02d}:{dryer_minute:02d}"
+    entry['dryerTimeFormatted'] = format_time_12h(dryer_hour, dryer_minute)
+
+
+def best_time(day: date, washers: np.ndarray, dryers: np.ndarray, objective: Objective,
+              blocked: np.ndarray) -> Dict:
+    """Best single run on one day under ``objective``, in schedule-entry format"""
+    scores, dryer_slots = objective.evaluate(washers, dryers, blocked)
+    ranked = rank_slots(scores, 1)
+    if len(ranked) == 0:
+        return day_result(day, washers, dryers, scores)
+
+    slot = int(ranked[0])
+    entry = day_result(day, washers, dryers, scores, best_slot=slot)
+    if dryer_slots is not None:
+        add_dryer_time(entry, dryers, int(dryer_slots[slot]))
+    return entry
@@ -0,0 +1,31 @@
+"""Startup timing report
+
+Boot is timed phase by phase and logged, so a heavy import creeping onto
+the startup path shows up as a cold-start regression in the logs. This
+module must stay free of heavy imports itself.
+"""
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupTimer:
+    """Collects the duration of each named startup phase"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        """Log every phase and the total time since the timer was created"""
+        for name, duration in self.phases:
+            print(f'[Startup] {name}: {duration * 1000:.1f} ms')
+        print(f'[Startup] Ready to serve after {(time.perf_counter() - self.started) * 1000:.1f} ms')
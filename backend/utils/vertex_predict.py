@@ -1,6 +1,10 @@
 """Vertex AI endpoint prediction client"""
+import asyncio
 import os
-from google.cloud import aiplatform
+import threading
+import time
+
+from .backends import PredictionBackend
 
 # Vertex AI endpoint IDs
 ENDPOINT_IDS = {
@@ -11,37 +15,124 @@ ENDPOINT_IDS = {
 PROJECT = os.environ.get('VERTEX_PROJECT', 'far-laundry-backend')
 LOCATION = os.environ.get('VERTEX_LOCATION', 'us-central1')
 
+# Online prediction requests are capped at 1.5 MB; 5000 rows of 7 small
+# integers serialize to roughly 125 KB, leaving ample headroom
+MAX_BATCH_ROWS = int(os.environ.get('VERTEX_MAX_BATCH_ROWS', '5000'))
+
+# How long (seconds) a deployed-model lookup is trusted before re-checking
+# the endpoint; a prediction served by an unknown model re-checks sooner
+MODEL_VERSION_TTL = float(os.environ.get('VERTEX_MODEL_VERSION_TTL', '300'))
+
+# Retry delay (seconds) after a failed deployed-model lookup
+MODEL_VERSION_RETRY = 30.0
+
 # Cache endpoint objects to avoid re-initializing
 _endpoint_cache = {}
+_endpoint_lock = threading.Lock()
+
+# target_type -> (expires_at, version, deployed model IDs)
+_version_cache = {}
+_version_lock = threading.Lock()
+
+
+def _import_sdk():
+    """Import the Vertex AI SDK on first use
+
+    The SDK import chain is heavy (seconds on a cold container), so it is
+    kept off the startup path and only paid when a prediction is made.
+    """
+    start = time.perf_counter()
+    from google.cloud import aiplatform
+    elapsed = time.perf_counter() - start
+    if elapsed > 0.01:
+        print(f'[Vertex] Imported SDK in {elapsed * 1000:.0f} ms')
+    return aiplatform
 
 
 def _get_endpoint(target_type):
     """Get or create a cached Vertex AI endpoint client"""
-    if target_type not in _endpoint_cache:
-        aiplatform.init(project=PROJECT, location=LOCATION)
-        endpoint_id = ENDPOINT_IDS[target_type]
-        _endpoint_cache[target_type] = aiplatform.Endpoint(endpoint_id)
-        print(f'[Vertex] Initialized {target_type} endpoint: {endpoint_id}')
-    return _endpoint_cache[target_type]
+    endpoint = _endpoint_cache.get(target_type)
+    if endpoint is not None:
+        return endpoint
 
+    # Requests may arrive concurrently; initialize each endpoint only once
+    with _endpoint_lock:
+        if target_type not in _endpoint_cache:
+            aiplatform = _import_sdk()
+            start = time.perf_counter()
+            aiplatform.init(project=PROJECT, location=LOCATION)
+            endpoint_id = ENDPOINT_IDS[target_type]
+            _endpoint_cache[target_type] = aiplatform.Endpoint(endpoint_id)
+            print(f'[Vertex] Initialized {target_type} endpoint: {endpoint_id} '
+                  f'({(time.perf_counter() - start) * 1000:.0f} ms)')
+        return _endpoint_cache[target_type]
 
-def vertex_batch_predict(target_type, features_list):
-    """Send a batch of feature rows to a Vertex AI endpoint.
 
-    Args:
-        target_type: 'washers' or 'dryers'
-        features_list: list of dicts with keys: hall, month, weekday, hour, minute, year, day
+class VertexBackend(PredictionBackend):
+    """Predicts through the deployed Vertex AI endpoints"""
+    name = 'vertex'
+    max_batch_rows = MAX_BATCH_ROWS
 
-    Returns:
-        list of predicted values (floats)
-    """
-    endpoint = _get_endpoint(target_type)
+    def model_version(self, target_type):
+        """Version of the models currently deployed behind the endpoint
+
+        Keyed on the deployed model and model version IDs, so stored
+        forecasts change when a new model is deployed to the same endpoint.
+        The lookup is an API call, so its result is cached for
+        MODEL_VERSION_TTL seconds.
+        """
+        cached = _version_cache.get(target_type)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        with _version_lock:
+            cached = _version_cache.get(target_type)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+
+            try:
+                deployed = _get_endpoint(target_type).list_models()
+                deployed_ids = frozenset(model.id for model in deployed)
+                models = '+'.join(sorted(f'{model.id}.{model.model_version_id or 0}' for model in deployed))
+                version = f'{self.name}-{ENDPOINT_IDS[target_type]}-{models}'
+                expires_at = time.monotonic() + MODEL_VERSION_TTL
+            except Exception as e:
+                # Keep the last known version (or the bare endpoint) and retry
+                # only after MODEL_VERSION_RETRY; with no known deployed IDs,
+                # predictions do not force an earlier lookup
+                print(f'[Vertex] Deployed model lookup failed for {target_type}: {e}')
+                deployed_ids = frozenset()
+                version = cached[1] if cached else f'{self.name}-{ENDPOINT_IDS[target_type]}'
+                expires_at = time.monotonic() + min(MODEL_VERSION_TTL, MODEL_VERSION_RETRY)
+
+            _version_cache[target_type] = (expires_at, version, deployed_ids)
+            return version
+
+    def _check_deployed_model(self, target_type, response):
+        """Expire the cached version when a prediction came from an unknown model
+
+        Skipped after a failed lookup (no known IDs), so the retry delay holds.
+        """
+        cached = _version_cache.get(target_type)
+        deployed_model_id = getattr(response, 'deployed_model_id', None)
+        if cached is not None and cached[2] and deployed_model_id and deployed_model_id not in cached[2]:
+            print(f'[Vertex] {target_type} served by new deployed model {deployed_model_id}')
+            _version_cache.pop(target_type, None)
+
+    def predict(self, target_type, features):
+        endpoint = _get_endpoint(target_type)
+
+        # Vertex AI expects instances as JSON lists of feature values
+        response = endpoint.predict(instances=features.tolist())
+        self._check_deployed_model(target_type, response)
+        return response.predictions
 
-    # Vertex AI expects instances as lists of feature values (matching training order)
-    instances = [
-        [f['hall'], f['month'], f['weekday'], f['hour'], f['minute'], f['year'], f['day']]
-        for f in features_list
-    ]
+    async def apredict(self, target_type, features):
+        # Endpoint creation may import the SDK, so it stays off the event loop
+        endpoint = _endpoint_cache.get(target_type)
+        if endpoint is None:
+            endpoint = await asyncio.to_thread(_get_endpoint, target_type)
 
-    response = endpoint.predict(instances=instances)
-    return response.predictions
+        response = await endpoint.predict_async(instances=features.tolist())
+        self._check_deployed_model(target_type, response)
+        return response.predictions